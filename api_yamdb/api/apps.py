@@ -1,5 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
 
 
 class ApiConfig(AppConfig):  # type: ignore
     name = 'api'
+
+    def ready(self):
+        from .cache import check_shared_cache
+        from .db import check_connections
+        from .signals import connect_catalog_signals
+        check_shared_cache()
+        connect_catalog_signals()
+        if settings.DB_CONN_HEALTH_CHECKS:
+            request_started.connect(check_connections)
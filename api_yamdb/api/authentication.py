@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import UserRoleMixin
+
+ROLE_CLAIM = 'role'
+USER_CLAIMS = ('username', 'is_staff', 'is_superuser', ROLE_CLAIM)
+
+_user_cache = {}
+
+
+def get_access_token(user):
+    """Выдаёт access-токен с ролью пользователя в claims."""
+    token = RefreshToken.for_user(user).access_token
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def forget_user(user_id):
+    """Убирает пользователя из кэша процесса, например после смены роли."""
+    _user_cache.pop(user_id, None)
+
+
+class RoleTokenUser(UserRoleMixin, TokenUser):
+    """Пользователь, собранный из claims токена без запроса к базе."""
+
+    @cached_property
+    def role(self):
+        return self.token[ROLE_CLAIM]
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без загрузки пользователя из базы.
+
+    Права проверяются по claims токена, поэтому смена роли вступает
+    в силу после истечения уже выданных access-токенов. Токены без роли
+    обрабатываются как раньше, но пользователь кэшируется в процессе
+    на JWT_USER_CACHE_TTL секунд.
+    """
+
+    def get_user(self, validated_token):
+        if ROLE_CLAIM in validated_token:
+            return RoleTokenUser(validated_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        expires_at, cached_user = _user_cache.get(user_id, (0, None))
+        if expires_at > time.monotonic():
+            return cached_user
+        user = super().get_user(validated_token)
+        if len(_user_cache) >= settings.JWT_USER_CACHE_SIZE:
+            _user_cache.clear()
+        _user_cache[user_id] = (
+            time.monotonic() + settings.JWT_USER_CACHE_TTL, user)
+        return user
@@ -0,0 +1,112 @@
+import logging
+import time
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import status
+from rest_framework.response import Response
+
+from .db import current_replica
+
+VERSION_KEY = 'catalog:version'
+
+logger = logging.getLogger(__name__)
+
+stats = Counter(hits=0, misses=0, invalidations=0)
+
+
+def get_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def is_shared(cache):
+    """Кэш виден всем процессам gunicorn, а не только своему."""
+    return settings.WEB_WORKERS <= 1 or not isinstance(cache, LocMemCache)
+
+
+def catalog_cache_enabled():
+    # Сброс LocMemCache не дошёл бы до других процессов gunicorn.
+    return settings.CATALOG_CACHE and is_shared(get_cache())
+
+
+def check_shared_cache():
+    """Проверяет при запуске, что кэш общий для процессов gunicorn.
+
+    Без общего кэша кэш каталога отключается с предупреждением;
+    закрепление за основной базой при заданных репликах без него
+    не работает, и запуск прерывается.
+    """
+    if settings.CATALOG_CACHE and not is_shared(get_cache()):
+        logger.warning(
+            'Кэш каталога отключён: LocMemCache не сбрасывается в других '
+            'процессах gunicorn, укажите CACHE_BACKEND (memcached).')
+    if settings.DATABASE_REPLICAS and not is_shared(caches['default']):
+        raise ImproperlyConfigured(
+            'Закрепление за основной базой в LocMemCache не видно другим '
+            'процессам gunicorn: укажите CACHE_BACKEND (memcached).'
+        )
+
+
+def get_version(cache):
+    """Текущая версия каталога; смена версии делает кэш недоступным."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        return cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate_catalog():
+    """Сбрасывает все закэшированные ответы каталога."""
+    get_cache().set(VERSION_KEY, time.time_ns(), timeout=None)
+    stats['invalidations'] += 1
+
+
+def replica_may_lag(version):
+    """Ответ прочитан с реплики вскоре после изменения каталога.
+
+    Версия — время последнего сброса; такой ответ может не содержать
+    изменения и не кэшируется, чтобы не закрепить его до таймаута.
+    """
+    return (current_replica() is not None and time.time_ns() - version
+            < settings.DB_REPLICA_PIN_SECONDS * 10 ** 9)
+
+
+def make_key(request, version):
+    """Ключ из пути и нормализованных параметров запроса."""
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+        if value != ''
+    )
+    return f'catalog:{version}:{request.path}?{urlencode(params)}'
+
+
+class CatalogCacheMixin:
+    """Кэширует ответы на чтение каталога до его следующего изменения."""
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not catalog_cache_enabled():
+            return handler(request, *args, **kwargs)
+        cache = get_cache()
+        version = get_version(cache)
+        key = make_key(request, version)
+        data = cache.get(key)
+        if data is not None:
+            stats['hits'] += 1
+            return Response(data, headers={'X-Cache': 'HIT'})
+        stats['misses'] += 1
+        response = handler(request, *args, **kwargs)
+        if (response.status_code == status.HTTP_200_OK
+                and not replica_may_lag(version)):
+            cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
@@ -0,0 +1,52 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import status
+
+
+def make_etag(request, last_modified):
+    """ETag из адреса, формата ответа и времени изменения данных."""
+    renderer = getattr(request, 'accepted_renderer', None)
+    source = '|'.join((
+        request.get_full_path(),
+        renderer.format if renderer else '',
+        last_modified.isoformat(),
+    ))
+    return quote_etag(hashlib.md5(source.encode()).hexdigest())
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 на If-None-Match/If-Modified-Since до сериализации.
+
+    Наследник определяет get_last_modified(): время последнего изменения
+    отдаваемых данных, полученное без рендеринга ответа.
+    """
+
+    def get_last_modified(self):
+        return None
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            return handler(request, *args, **kwargs)
+        etag = make_etag(request, last_modified)
+        timestamp = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        # RFC 7232: 304 несёт те же валидаторы, что и полный ответ.
+        if response.status_code in (
+                status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,61 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def check_connections(**kwargs):
+    """Закрывает сохранённые соединения, которые перестали отвечать.
+
+    Без проверки первый запрос после разрыва соединения базой или
+    пулером завершился бы ошибкой; после закрытия Django откроет
+    новое соединение при первом обращении.
+    """
+    for connection in connections.all():
+        if connection.connection is not None and not connection.is_usable():
+            connection.close()
+
+
+# Реплика, с которой читает текущий запрос в этом потоке.
+_state = threading.local()
+
+
+@contextmanager
+def read_from(alias):
+    """Направляет чтения внутри блока в базу alias."""
+    previous = getattr(_state, 'replica', None)
+    _state.replica = alias
+    try:
+        yield
+    finally:
+        _state.replica = previous
+
+
+def current_replica():
+    """Реплика, с которой сейчас читает поток, или None."""
+    return getattr(_state, 'replica', None)
+
+
+class ReplicaRouter:
+    """Читает с реплики, выбранной ReplicaMiddleware, пишет в default.
+
+    Вне read_from() и после первой записи в запросе все запросы идут
+    в default, так что запрос видит собственные изменения.
+    """
+
+    def db_for_read(self, model, **hints):
+        return current_replica()
+
+    def db_for_write(self, model, **hints):
+        _state.replica = None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же строки, что и default.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
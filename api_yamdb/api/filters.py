@@ -1,12 +1,32 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitlesFilter(filters.FilterSet):
     name = filters.CharFilter(field_name="name", lookup_expr='contains')
     category = filters.CharFilter(field_name="category__slug")
     genre = filters.CharFilter(field_name="genre__slug")
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('name', 'category', 'genre', 'year')
+        fields = ('name', 'category', 'genre', 'year', 'search')
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+class StableOrderingFilter(OrderingFilter):
+    """Сортировка по запросу с id последним ключом.
+
+    Иначе записи с равным значением поля переставляются между
+    запросами и страницы повторяют или теряют их.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering is None or {'id', '-id'} & set(ordering):
+            return ordering
+        return [*ordering, '-id']
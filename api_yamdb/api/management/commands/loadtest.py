@@ -0,0 +1,63 @@
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ('Нагружает запущенный сервер GET-запросами и печатает '
+            'пропускную способность и перцентили задержки в JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='Адреса для запросов.')
+        parser.add_argument(
+            '--requests', type=int, default=1000,
+            help='Сколько запросов отправить на каждый адрес.')
+        parser.add_argument(
+            '--concurrency', type=int, default=16,
+            help='Сколько запросов выполнять одновременно.')
+        parser.add_argument(
+            '--header', action='append', default=[],
+            help='Заголовок вида "Authorization: Bearer <token>".')
+
+    def handle(self, *args, **options):
+        headers = dict(
+            header.split(':', 1) for header in options['header'])
+        headers = {name.strip(): value.strip()
+                   for name, value in headers.items()}
+        report = {
+            url: self.run(url, headers, options['requests'],
+                          options['concurrency'])
+            for url in options['urls']
+        }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, url, headers, total, concurrency):
+        def fetch(_):
+            started = time.perf_counter()
+            try:
+                with urlopen(Request(url, headers=headers)) as response:
+                    response.read()
+                    status = response.status
+            except HTTPError as error:
+                status = error.code
+            return time.perf_counter() - started, status
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            results = list(executor.map(fetch, range(total)))
+        elapsed = time.perf_counter() - started
+        latencies = sorted(latency for latency, _ in results)
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            'requests': total,
+            'errors': sum(status >= 400 for _, status in results),
+            'rps': round(total / elapsed, 1),
+            'p50_ms': round(percentiles[49] * 1000, 2),
+            'p95_ms': round(percentiles[94] * 1000, 2),
+            'p99_ms': round(percentiles[98] * 1000, 2),
+        }
@@ -0,0 +1,85 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from api.cache import stats as catalog_cache_stats
+from api.throttling import rejected as throttle_rejected
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Гистограмма в духе Prometheus: счётчики по верхним границам."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(
+                f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+HISTOGRAMS = (
+    ('yamdb_request_duration_seconds', 'Время обработки запроса',
+     DURATION_BUCKETS),
+    ('yamdb_request_db_queries', 'Число SQL-запросов на запрос',
+     QUERY_BUCKETS),
+    ('yamdb_request_db_duration_seconds', 'Время SQL-запросов на запрос',
+     DURATION_BUCKETS),
+)
+
+_lock = threading.Lock()
+_routes = defaultdict(
+    lambda: tuple(Histogram(buckets) for _, _, buckets in HISTOGRAMS))
+
+
+def observe(route, duration, queries, db_duration):
+    with _lock:
+        for histogram, value in zip(
+                _routes[route], (duration, queries, db_duration)):
+            histogram.observe(value)
+
+
+def render():
+    """Метрики процесса в текстовом формате Prometheus."""
+    with _lock:
+        routes = sorted(_routes.items())
+        lines = []
+        for index, (name, help_text, _) in enumerate(HISTOGRAMS):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for route, histograms in routes:
+                lines.extend(
+                    histograms[index].render(name, f'route="{route}"'))
+    for key, value in sorted(catalog_cache_stats.items()):
+        name = f'yamdb_catalog_cache_{key}_total'
+        lines.append(f'# TYPE {name} counter')
+        lines.append(f'{name} {value}')
+    lines.append('# TYPE yamdb_throttled_requests_total counter')
+    for scope, value in sorted(throttle_rejected.items()):
+        lines.append(
+            f'yamdb_throttled_requests_total{{scope="{scope}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    with _lock:
+        _routes.clear()
@@ -0,0 +1,122 @@
+import heapq
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from . import metrics
+from .db import read_from
+
+slow_logger = logging.getLogger('api.slow_requests')
+
+
+class QueryRecorder:
+    """execute_wrapper, считающий запросы и их суммарное время."""
+
+    def __init__(self, keep_sql):
+        self.count = 0
+        self.duration = 0
+        self.keep_sql = keep_sql
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            if self.keep_sql:
+                self.statements.append((duration, sql))
+
+
+class RequestMetricsMiddleware:
+    """Собирает время, число и время SQL-запросов по имени маршрута."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+        recorder = QueryRecorder(
+            keep_sql=settings.SLOW_REQUEST_THRESHOLD is not None)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                return self.get_response(request)
+        finally:
+            self.record(request, time.perf_counter() - started, recorder)
+
+    def record(self, request, duration, recorder):
+        match = request.resolver_match
+        route = match.url_name if match and match.url_name else 'unresolved'
+        metrics.observe(route, duration, recorder.count, recorder.duration)
+        threshold = settings.SLOW_REQUEST_THRESHOLD
+        if threshold is not None and duration >= threshold:
+            self.log_slow_request(request, route, duration, recorder)
+
+    def log_slow_request(self, request, route, duration, recorder):
+        worst = heapq.nlargest(
+            settings.SLOW_REQUEST_TOP_QUERIES, recorder.statements,
+            key=lambda statement: statement[0])
+        slow_logger.warning(
+            'Медленный запрос %s %s (%s): %.3f с, SQL: %d за %.3f с\n%s',
+            request.method, request.path, route, duration,
+            recorder.count, recorder.duration,
+            '\n'.join(f'{sql_duration:.3f} с: {sql}'
+                      for sql_duration, sql in worst),
+        )
+
+
+def client_key(request):
+    """Кому принадлежит запрос: id пользователя из JWT или IP клиента."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = header and authentication.get_raw_token(header)
+    if raw_token:
+        try:
+            token = authentication.get_validated_token(raw_token)
+            return f'user:{token[jwt_settings.USER_ID_CLAIM]}'
+        except (InvalidToken, KeyError):
+            pass
+    return f'ip:{BaseThrottle().get_ident(request)}'
+
+
+class ReplicaMiddleware:
+    """Отправляет чтения безопасных запросов на случайную реплику.
+
+    После успешного изменяющего запроса клиент DB_REPLICA_PIN_SECONDS
+    секунд читает с основной базы: реплика может отставать, а свой
+    только что оставленный отзыв клиент должен увидеть сразу. Отметки
+    хранятся в кэше default, общем для процессов, если он не locmem.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        pin_key = f'replica-pin:{client_key(request)}'
+        if request.method in SAFE_METHODS:
+            if cache.get(pin_key):
+                return self.get_response(request)
+            with read_from(random.choice(settings.DATABASE_REPLICAS)):
+                return self.get_response(request)
+        response = self.get_response(request)
+        if response.status_code < 400:
+            cache.set(pin_key, True, settings.DB_REPLICA_PIN_SECONDS)
+        return response
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class ParentingCursorPagination(CursorPagination):
+    """Постраничный вывод отзывов и комментариев по курсору.
+
+    Не считает COUNT(*) и не использует OFFSET: страница читается
+    диапазоном индекса (родитель, pub_date, id).
+    """
+    ordering = ('-pub_date', '-id')
+    mode_query_param = 'pagination'
+    mode_query_value = 'cursor'
+
+    def is_requested(self, request):
+        params = request.query_params
+        return (self.cursor_query_param in params
+                or params.get(self.mode_query_param) == self.mode_query_value)
+
+    def get_ordering(self, request, queryset, view):
+        # Позиция курсора — (pub_date, id): по другим полям, в том числе
+        # допускающим NULL, курсор терял бы записи или падал.
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            raise ValidationError({api_settings.ORDERING_PARAM: [
+                'Курсорная пагинация поддерживает только порядок по дате.']})
+        return self.ordering
+
+
+class PositionPagination(BasePagination):
+    """Постраничный вывод лидерборда по номерам позиций.
+
+    Позиции каждого рейтинга идут подряд с 1, поэтому страница читается
+    диапазоном индекса без COUNT(*) и OFFSET.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_query_param = 'page'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            self.page = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            raise NotFound('Неверная страница.')
+        if self.page < 1:
+            raise NotFound('Неверная страница.')
+        offset = (self.page - 1) * self.page_size
+        # Лишняя позиция показывает, есть ли следующая страница.
+        results = list(queryset.filter(
+            position__gt=offset, position__lte=offset + self.page_size + 1))
+        self.has_next = len(results) > self.page_size
+        return results[:self.page_size]
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_link(self.page + 1) if self.has_next else None),
+            ('previous', self.get_link(self.page - 1)
+             if self.page > 1 else None),
+            ('results', data),
+        ]))
+
+    def get_link(self, page):
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.page_query_param, page)
@@ -10,6 +10,15 @@ class IsAdminOrSuperUser(permissions.BasePermission):
                 and request.user.is_admin)
 
 
+class IsAdminOrModerator(permissions.BasePermission):
+    """Проверка прав администратора или модератора."""
+    message = 'Нужны права администратора или модератора'
+
+    def has_permission(self, request, view):
+        return (request.user.is_authenticated
+                and (request.user.is_admin or request.user.is_moderator))
+
+
 class IsAdminOrReadOnly(permissions.BasePermission):
     """Проверка прав администратора."""
     message = 'Нужны права администратора.'
@@ -34,5 +43,5 @@ class IsAdminOrModeratorOrAuthor(permissions.BasePermission):
             request.method in permissions.SAFE_METHODS
             or request.user.is_admin
             or request.user.is_moderator
-            or request.user == obj.author
+            or request.user.id == obj.author_id
         )
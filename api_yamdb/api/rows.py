@@ -0,0 +1,123 @@
+from collections import defaultdict
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+from reviews.models import GenreTitle
+
+
+class Rows:
+    """Строки .values() в dict той же формы, что у сериализатора списка.
+
+    fields — пары (ключ ответа, столбец values()) в порядке полей
+    сериализатора. Даты выводятся через DateTimeField DRF, поэтому
+    формат и часовой пояс совпадают. Совпадение ответов проверяет
+    tests/test_fast_lists.py.
+    """
+    fields = ()
+    datetime_fields = ()
+
+    def __init__(self):
+        to_datetime = serializers.DateTimeField().to_representation
+        self.columns = tuple(column for _, column in self.fields)
+        self.mapping = tuple(
+            (key, column,
+             to_datetime if key in self.datetime_fields else None)
+            for key, column in self.fields
+        )
+
+    def to_dict(self, row):
+        item = {}
+        for key, column, convert in self.mapping:
+            value = row[column]
+            item[key] = value if convert is None or value is None else (
+                convert(value))
+        return item
+
+    def serialize(self, rows):
+        return [self.to_dict(row) for row in rows]
+
+
+class ReviewRows(Rows):
+    fields = (
+        ('id', 'id'),
+        ('author', 'author__username'),
+        ('score', 'score'),
+        ('text', 'text'),
+        ('pub_date', 'pub_date'),
+        ('comments_count', 'comments_count'),
+        ('last_comment_at', 'last_comment_at'),
+        ('title', 'title'),
+    )
+    datetime_fields = ('pub_date', 'last_comment_at')
+
+
+class CommentRows(Rows):
+    fields = (
+        ('id', 'id'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('pub_date', 'pub_date'),
+        ('review', 'review'),
+    )
+    datetime_fields = ('pub_date',)
+
+
+class TitleRows:
+    """Форма TitleReadSerializer без rating_distribution."""
+    columns = (
+        'id', 'name', 'year', 'rating_sum', 'rating_count', 'description',
+        'category__name', 'category__slug',
+    )
+
+    def serialize(self, rows):
+        # Жанры страницы одним запросом, в порядке Genre.Meta.ordering,
+        # как при prefetch_related('genre').
+        genres = defaultdict(list)
+        for title_id, name, slug in GenreTitle.objects.filter(
+                title_id__in=[row['id'] for row in rows],
+                genre__isnull=False).order_by('-genre_id').values_list(
+                'title_id', 'genre__name', 'genre__slug'):
+            genres[title_id].append({'name': name, 'slug': slug})
+        return [self.to_dict(row, genres[row['id']]) for row in rows]
+
+    def to_dict(self, row, genres):
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'year': row['year'],
+            'rating': (row['rating_sum'] // row['rating_count']
+                       if row['rating_count'] else None),
+            'description': row['description'],
+            'genre': genres,
+            'category': None if row['category__slug'] is None else {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            },
+        }
+
+
+class FastListMixin:
+    """Выводит list() через .values() и fast_rows вместо сериализатора.
+
+    fast_rows задаёт столбцы (columns) и превращает страницу строк
+    в данные ответа (serialize). Выключается настройкой
+    FAST_LIST_SERIALIZATION или переопределением use_fast_list().
+    """
+    fast_rows = None
+
+    def use_fast_list(self):
+        return (settings.FAST_LIST_SERIALIZATION
+                and self.fast_rows is not None)
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_list():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Столбцы extra() (ранг поиска) нужны для сортировки.
+        queryset = queryset.prefetch_related(None).values(
+            *self.fast_rows.columns, *queryset.query.extra_select)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(self.fast_rows.serialize(list(queryset)))
+        return self.get_paginated_response(self.fast_rows.serialize(page))
@@ -1,13 +1,12 @@
 import datetime as dt
 
 from django.conf import settings
-from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.shortcuts import get_object_or_404
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 from reviews import validators
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import Category, Comment, Genre, Review, Title, TitleRank
 from users.models import CustomUser as User
 
 
@@ -54,7 +53,8 @@ class UserSerializer(
         fields = (
             'username', 'email',
             'first_name', 'last_name',
-            'bio', 'role',)
+            'bio', 'role',
+            'review_count', 'comment_count', 'average_score',)
 
 
 class AuthorSerializer(UserSerializer):
@@ -101,15 +101,41 @@ class GenreSerializer(serializers.ModelSerializer):
         return value
 
 
+class RatingDistributionSerializer(serializers.Serializer):
+    """Распределение оценок по хранимым счётчикам произведения."""
+    count = serializers.IntegerField(source='rating_count')
+    mean = serializers.SerializerMethodField()
+    median = serializers.FloatField(source='rating_median')
+    histogram = serializers.SerializerMethodField()
+
+    def get_mean(self, title):
+        if not title.rating_count:
+            return None
+        return round(title.rating_sum / title.rating_count, 2)
+
+    def get_histogram(self, title):
+        return {
+            str(score): count
+            for score, count in title.score_histogram.items()
+        }
+
+
 class TitleReadSerializer(serializers.ModelSerializer):
-    """Сериализатор для просмотра произведений."""
+    """Сериализатор для просмотра произведений.
+
+    Распределение оценок выводится по запросу ?expand=rating_distribution.
+    """
     category = CategorySerializer(many=False, read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
     rating = serializers.IntegerField(read_only=True)
+    rating_distribution = RatingDistributionSerializer(
+        source='*', read_only=True)
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = (
+            'id', 'name', 'year', 'rating', 'rating_distribution',
+            'description', 'genre', 'category')
         read_only_fields = (
             'id',
             'name',
@@ -118,6 +144,23 @@ class TitleReadSerializer(serializers.ModelSerializer):
             'category',
             'genre')
 
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or 'rating_distribution' not in (
+                request.query_params.getlist('expand')):
+            del fields['rating_distribution']
+        return fields
+
+
+class TitleRankSerializer(serializers.ModelSerializer):
+    """Сериализатор позиции произведения в лидерборде."""
+    title = TitleReadSerializer(read_only=True)
+
+    class Meta:
+        model = TitleRank
+        fields = ('position', 'score', 'reviews', 'title')
+
 
 class TitleWriteSerializer(serializers.ModelSerializer):
     """Сериализатор для изменения произведений."""
@@ -133,9 +176,10 @@ class TitleWriteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
 
     def to_representation(self, value):
+        prefetch_related_objects([self.instance], 'genre')
         return TitleReadSerializer(self.instance).data
 
     def validate_year(self, value):
@@ -146,7 +190,10 @@ class TitleWriteSerializer(serializers.ModelSerializer):
 
 
 class ReviewSerializer(serializers.ModelSerializer):
-    """Сериалайзер для отзывов. Валидирует оценку и уникальность."""
+    """Сериалайзер для отзывов. Валидирует оценку.
+
+    Уникальность отзыва проверяет ограничение в базе при сохранении.
+    """
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True
@@ -157,21 +204,9 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = '__all__'
+        exclude = ('updated_at',)
         read_only_fields = ('title', 'author')
 
-    def validate(self, data):
-        request = self.context['request']
-        if request.method == 'POST':
-            author = request.user
-            title_id = self.context.get('view').kwargs.get('title_id')
-            title = get_object_or_404(Title, pk=title_id)
-            if Review.objects.filter(title=title, author=author).exists():
-                raise ValidationError(
-                    'Больше одного отзыва на title писать нельзя'
-                )
-        return data
-
 
 class CommentSerializer(serializers.ModelSerializer):
     """Сериалайзер для комментариев."""
@@ -181,6 +216,34 @@ class CommentSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('updated_at',)
         model = Comment
         read_only_fields = ('review',)
+
+
+class ModerationSerializer(serializers.Serializer):
+    """Условия отбора отзывов или комментариев для удаления."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        required=False)
+    author = serializers.SlugRelatedField(
+        slug_field='username',
+        queryset=User.objects.all(),
+        required=False)
+    title = serializers.PrimaryKeyRelatedField(
+        queryset=Title.objects.all(),
+        required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError(
+                'Укажите хотя бы одно условие: ids, author, title, '
+                'since или until.')
+        if data.get('since') and data.get('until') and (
+                data['since'] > data['until']):
+            raise serializers.ValidationError(
+                'Начало периода позже его конца.')
+        return data
@@ -0,0 +1,28 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+from reviews.signals import on_commit_once, titles_bulk_created
+
+from .cache import invalidate_catalog
+
+CATALOG_MODELS = (Title, Genre, Category, GenreTitle, Review)
+
+
+def catalog_changed(sender, **kwargs):
+    if kwargs.get('action', 'post_').startswith('pre_'):
+        return
+    # Иначе параллельный запрос успеет закэшировать
+    # ещё не закоммиченное состояние.
+    on_commit_once(invalidate_catalog)
+
+
+def connect_catalog_signals():
+    for model in CATALOG_MODELS:
+        post_save.connect(
+            catalog_changed, sender=model, dispatch_uid=f'catalog_{model}')
+        post_delete.connect(
+            catalog_changed, sender=model, dispatch_uid=f'catalog_{model}')
+    m2m_changed.connect(
+        catalog_changed, sender=Title.genre.through,
+        dispatch_uid='catalog_title_genre')
+    titles_bulk_created.connect(
+        catalog_changed, sender=Title, dispatch_uid='catalog_titles_bulk')
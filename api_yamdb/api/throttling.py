@@ -0,0 +1,143 @@
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+
+rejected = Counter()
+
+
+class LocalCounterStore:
+    """Счётчики окон в памяти процесса.
+
+    На ключ хранится [номер окна, запросов в нём, запросов в прошлом].
+    Ключей не больше max_keys: сначала выбрасываются устаревшие,
+    затем самые старые.
+    """
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def hit(self, key, window, duration):
+        with self.lock:
+            entry = self.counters.get(key)
+            if entry is None:
+                if len(self.counters) >= self.max_keys:
+                    self.evict(window)
+                entry = self.counters[key] = [window, 0, 0]
+            elif entry[0] != window:
+                entry[2] = entry[1] if entry[0] == window - 1 else 0
+                entry[0], entry[1] = window, 0
+            entry[1] += 1
+            return entry[2], entry[1]
+
+    def evict(self, window):
+        self.counters = {
+            key: entry for key, entry in self.counters.items()
+            if entry[0] >= window - 1
+        }
+        while len(self.counters) >= self.max_keys:
+            del self.counters[next(iter(self.counters))]
+
+    def clear(self):
+        with self.lock:
+            self.counters.clear()
+
+
+class CacheCounterStore:
+    """Счётчики окон в кэше Django, общие для всех процессов gunicorn."""
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def hit(self, key, window, duration):
+        cache = caches[self.alias]
+        current_key = f'{key}:{window}'
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # Первый запрос в окне; add не перезапишет чужой счётчик.
+            if cache.add(current_key, 1, timeout=2 * duration):
+                current = 1
+            else:
+                current = cache.incr(current_key)
+        return cache.get(f'{key}:{window - 1}', 0), current
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+def make_store():
+    if settings.THROTTLE_STORE == 'cache':
+        return CacheCounterStore(settings.THROTTLE_CACHE_ALIAS)
+    return LocalCounterStore(settings.THROTTLE_LOCAL_MAX_KEYS)
+
+
+store = make_store()
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Ограничение частоты по скользящему окну из двух счётчиков.
+
+    Запросы прошлого окна учитываются с весом, убывающим по мере
+    прохождения текущего, поэтому на стыке окон нельзя сделать
+    двойное число запросов. В отличие от SimpleRateThrottle хранит
+    два числа на ключ, а не список времён запросов.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        window, self.offset = divmod(self.timer(), self.duration)
+        self.previous, self.current = store.hit(
+            self.key, int(window), self.duration)
+        estimate = (self.previous * (1 - self.offset / self.duration)
+                    + self.current)
+        if estimate <= self.num_requests:
+            return True
+        rejected[self.scope] += 1
+        return False
+
+    def wait(self):
+        limit, duration = self.num_requests, self.duration
+        if self.current > limit:
+            # Ждать конца окна и пока вклад его запросов не спадёт.
+            return duration - self.offset + duration * (
+                1 - limit / self.current)
+        return max(duration * (
+            1 - (limit - self.current) / self.previous) - self.offset, 0)
+
+
+class SignUpRateThrottle(SlidingWindowThrottle):
+    """Регистрация и отправка кода: по IP."""
+    scope = 'signup'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class TokenRateThrottle(SignUpRateThrottle):
+    """Получение токена: по IP, от подбора кода подтверждения."""
+    scope = 'token'
+
+
+class WriteRateThrottle(SlidingWindowThrottle):
+    """Изменяющие запросы: по пользователю, анонимные — по IP."""
+    scope = 'writes'
+
+    def get_cache_key(self, request, view):
+        if request.method in SAFE_METHODS:
+            return None
+        if request.user and request.user.is_authenticated:
+            ident = request.user.id
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
@@ -1,9 +1,10 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    RegisterView, ReviewViewSet, TitleViewSet, TokenView,
-                    UserViewSet)
+from .views import (CategoryViewSet, CommentModerationView, CommentViewSet,
+                    GenreViewSet, LeaderboardViewSet, MetricsView,
+                    RegisterView, ReviewModerationView, ReviewViewSet,
+                    TitleViewSet, TokenView, UserViewSet)
 
 app_name = 'api'
 
@@ -12,6 +13,11 @@ router_v1.register('users', UserViewSet, basename='users')
 router_v1.register('categories', CategoryViewSet, basename='categories')
 router_v1.register('genres', GenreViewSet, basename='genres')
 router_v1.register('titles', TitleViewSet, basename='titles')
+router_v1.register(
+    r'leaderboards/(?P<board>top|trending)',
+    LeaderboardViewSet,
+    basename='leaderboards'
+)
 router_v1.register(
     r"titles/(?P<title_id>\d+)/reviews",
     ReviewViewSet,
@@ -30,5 +36,16 @@ urlpatterns_auth = [
 
 urlpatterns = [
     path('v1/auth/', include(urlpatterns_auth)),
+    path('v1/metrics/', MetricsView.as_view(), name='metrics'),
+    path(
+        'v1/moderation/reviews/',
+        ReviewModerationView.as_view(),
+        name='moderation-reviews'
+    ),
+    path(
+        'v1/moderation/comments/',
+        CommentModerationView.as_view(),
+        name='moderation-comments'
+    ),
     path('v1/', include(router_v1.urls)),
 ]
@@ -1,16 +1,15 @@
 import random
 
 from django.conf import settings
-from django.core.mail import send_mail
+from users.models import OutboxEmail
 
 
 def send_confirmation_code(email: str, confirmation_code: str) -> None:
-    """Отправляет код подтверждения на почту пользователя."""
-    send_mail(
+    """Ставит письмо с кодом подтверждения в очередь на отправку."""
+    OutboxEmail.objects.create(
         subject='Код подтверждения',
-        message=f'Ваш код: {confirmation_code}',
-        from_email=settings.CONTACT_EMAIL,
-        recipient_list=[email],
+        body=f'Ваш код: {confirmation_code}',
+        recipient=email,
     )
 
 
@@ -1,36 +1,59 @@
-from api.filters import TitlesFilter
-from api.permissions import (IsAdminOrModeratorOrAuthor, IsAdminOrReadOnly,
-                             IsAdminOrSuperUser)
+import io
+from functools import partial
+
+from api import metrics
+from api.activity import ActivityFeed
+from api.authentication import forget_user, get_access_token
+from api.cache import CatalogCacheMixin
+from api.conditional import ConditionalGetMixin
+from api.filters import StableOrderingFilter, TitlesFilter
+from api.pagination import ParentingCursorPagination, PositionPagination
+from api.permissions import (IsAdminOrModerator, IsAdminOrModeratorOrAuthor,
+                             IsAdminOrReadOnly, IsAdminOrSuperUser)
+from api.rows import CommentRows, FastListMixin, ReviewRows, TitleRows
 from api.serializers import (AuthorSerializer, CategorySerializer,
                              CommentSerializer, GenreSerializer,
-                             ReviewSerializer, SignUpSerializer,
+                             ModerationSerializer,
+                             RatingDistributionSerializer, ReviewSerializer,
+                             SignUpSerializer, TitleRankSerializer,
                              TitleReadSerializer, TitleWriteSerializer,
                              TokenSerializer, UserSerializer)
+from api.throttling import SignUpRateThrottle, TokenRateThrottle
 from api.utils import generate_confirmation_code, send_confirmation_code
+from django.apps import apps
 from django.conf import settings
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
 from rest_framework import filters, mixins, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title
+from reviews.facets import count_facet, format_facets, stored_facets
+from reviews.importers import (ENCODING, check_encoding, get_format,
+                               import_titles, read_rows)
+from reviews.models import (Category, Comment, FacetCount, Genre, Review,
+                            Title, TitleRank)
+from reviews.moderation import delete_in_chunks
+from reviews.signals import batched_updates
 from users.models import CustomUser as User
 
 
 class RegisterView(APIView):
     """Регистирирует пользователя и отправляет
        ему код подтверждения на email."""
+    throttle_classes = [SignUpRateThrottle]
+
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         email = serializer.validated_data.get('email')
         username = serializer.validated_data.get('username')
-        confirmation_code = generate_confirmation_code()
         try:
             user, _ = User.objects.get_or_create(
                 email=email, username=username)
@@ -43,14 +66,18 @@ class RegisterView(APIView):
             return Response(
                 message,
                 status=status.HTTP_400_BAD_REQUEST)
-        user.confirmation_code = generate_confirmation_code()
-        user.save()
-        send_confirmation_code(email, confirmation_code)
+        confirmation_code = generate_confirmation_code()
+        with transaction.atomic():
+            user.confirmation_code = confirmation_code
+            user.save(update_fields=('confirmation_code',))
+            send_confirmation_code(email, confirmation_code)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class TokenView(APIView):
     """Проверяет код подтверждения и отправляет токен."""
+    throttle_classes = [TokenRateThrottle]
+
     def post(self, request):
         serializer = TokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -66,14 +93,63 @@ class TokenView(APIView):
                 'Confirmation code is invalid',
                 status=status.HTTP_400_BAD_REQUEST)
         user.confirmation_code = ' '
-        user.save()
-        refresh = RefreshToken.for_user(user)
+        user.save(update_fields=('confirmation_code',))
         return Response(
-            {'access_token': str(refresh.access_token)},
+            {'access_token': str(get_access_token(user))},
             status=status.HTTP_200_OK
         )
 
 
+class MetricsView(APIView):
+    """Метрики запросов процесса в формате Prometheus."""
+    permission_classes = [IsAdminOrSuperUser]
+
+    def get(self, request):
+        return HttpResponse(
+            metrics.render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class ModerationView(APIView):
+    """Удаляет отзывы или комментарии по условиям одним запросом."""
+    permission_classes = [IsAdminOrModerator]
+    model = None
+    title_field = None
+
+    def post(self, request):
+        serializer = ModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        lookups = {
+            'pk__in': data.get('ids'),
+            'author': data.get('author'),
+            self.title_field: data.get('title'),
+            'pub_date__gte': data.get('since'),
+            'pub_date__lte': data.get('until'),
+        }
+        deleted = delete_in_chunks(
+            self.model.objects.filter(**{
+                lookup: value for lookup, value in lookups.items()
+                if value is not None
+            }),
+            settings.MODERATION_CHUNK_SIZE,
+        )
+        return Response({'deleted': {
+            apps.get_model(label)._meta.default_related_name: count
+            for label, count in deleted.items()
+        }}, status=status.HTTP_200_OK)
+
+
+class ReviewModerationView(ModerationView):
+    model = Review
+    title_field = 'title'
+
+
+class CommentModerationView(ModerationView):
+    model = Comment
+    title_field = 'review__title'
+
+
 class UserViewSet(viewsets.ModelViewSet):
     """Админ получает список пользователей или создает нового"""
     queryset = User.objects.all()
@@ -82,23 +158,45 @@ class UserViewSet(viewsets.ModelViewSet):
     lookup_field = 'username'
     search_fields = ('username', )
 
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        forget_user(serializer.instance.id)
+
+    def perform_destroy(self, instance):
+        forget_user(instance.id)
+        super().perform_destroy(instance)
+
     @action(
         methods=['GET', 'PATCH'],
         detail=False,
         permission_classes=(permissions.IsAuthenticated,),
         url_path='me')
     def user_info(self, request):
+        # request.user может быть собран из токена, профиль читаем из базы.
+        user = get_object_or_404(User, pk=request.user.id)
         if request.method == 'GET':
-            serializer = AuthorSerializer(request.user)
+            serializer = AuthorSerializer(user)
         else:
             serializer = AuthorSerializer(
-                request.user, data=request.data, partial=True)
+                user, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
             serializer.save()
+            forget_user(user.id)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(
+        detail=True,
+        permission_classes=(permissions.AllowAny,),
+        url_path='activity')
+    def activity(self, request, username=None):
+        # Отзывы и комментарии и так открыты всем.
+        user = get_object_or_404(
+            User.objects.only('id'), username=username)
+        return ActivityFeed().get_response(request, user.id)
+
 
 class CLDMixinSet(
+    CatalogCacheMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -121,43 +219,245 @@ class CategoryViewSet(CLDMixinSet):
     serializer_class = CategorySerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score'))
+class TitleViewSet(
+    ConditionalGetMixin, CatalogCacheMixin, FastListMixin,
+    viewsets.ModelViewSet
+):
+    queryset = Title.objects.all()
+    fast_rows = TitleRows()
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     filterset_class = TitlesFilter
     ordering_fields = ('name',)
 
+    def get_queryset(self):
+        if self.action in ('destroy', 'rating_distribution'):
+            return self.queryset.all()
+        # Категория и жанры выводятся в TitleReadSerializer,
+        # в том числе после записи через TitleWriteSerializer.
+        return self.queryset.select_related(
+            'category').prefetch_related('genre')
+
+    def use_fast_list(self):
+        return super().use_fast_list() and (
+            'expand' not in self.request.query_params)
+
+    def get_last_modified(self):
+        if self.action not in ('retrieve', 'rating_distribution'):
+            return None
+        try:
+            return Title.objects.filter(pk=self.kwargs.get('pk')).values_list(
+                'updated_at', flat=True).first()
+        except (TypeError, ValueError):
+            return None
+
+    def retrieve(self, request, *args, **kwargs):
+        # Проверка актуальности дешевле даже чтения из кэша.
+        return self.conditional_response(
+            partial(self.cached_response,
+                    partial(mixins.RetrieveModelMixin.retrieve, self)),
+            request, *args, **kwargs)
+
+    @action(detail=True, url_path='rating')
+    def rating_distribution(self, request, pk=None):
+        return self.conditional_response(self.get_rating_distribution, request)
+
+    def get_rating_distribution(self, request):
+        return Response(self.get_serializer(self.get_object()).data)
+
+    @action(detail=False)
+    def facets(self, request):
+        return self.cached_response(self.get_facets_response, request)
+
+    def get_facets_response(self, request):
+        return Response(self.get_facets())
+
+    def get_facets(self):
+        """Число произведений по значениям фильтров при текущих фильтрах.
+
+        Каждый фасет считается с остальными фильтрами, но без своего:
+        число у значения — сколько произведений найдётся, если выбрать
+        его. Фасеты без других фильтров берутся из таблицы FacetCount.
+        """
+        params = self.request.query_params
+        active = {name for name in self.filterset_class.base_filters
+                  if params.get(name)}
+        unfiltered = [facet for facet, _ in FacetCount.FACETS
+                      if not active - {facet}]
+        rows = stored_facets(*unfiltered)
+        for facet, _ in FacetCount.FACETS:
+            if facet in unfiltered:
+                continue
+            data = params.copy()
+            data.pop(facet, None)
+            filterset = self.filterset_class(
+                data, queryset=self.queryset.all(), request=self.request)
+            if not filterset.is_valid():
+                raise translate_validation(filterset.errors)
+            rows += count_facet(facet, filterset.qs)
+        return format_facets(rows)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.request.query_params.get('facets') == '1':
+            response.data['facets'] = self.get_facets()
+        return response
+
+    @action(methods=['POST'], detail=False, url_path='import')
+    def bulk_import(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {'file': ['Обязательное поле.']},
+                status=status.HTTP_400_BAD_REQUEST)
+        try:
+            file_format = get_format(
+                upload.name, request.data.get('file_format'))
+        except ValueError as error:
+            return Response(
+                {'file_format': [str(error)]},
+                status=status.HTTP_400_BAD_REQUEST)
+        try:
+            check_encoding(upload.file)
+        except UnicodeDecodeError:
+            return Response(
+                {'file': [f'Файл должен быть в кодировке {ENCODING}.']},
+                status=status.HTTP_400_BAD_REQUEST)
+        stream = io.TextIOWrapper(upload.file, encoding=ENCODING, newline='')
+        result = import_titles(read_rows(stream, file_format))
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleReadSerializer
+        if self.action == 'rating_distribution':
+            return RatingDistributionSerializer
         return TitleWriteSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class LeaderboardViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Лидерборд из таблицы TitleRank: общий, ?category= или ?genre=."""
+    serializer_class = TitleRankSerializer
+    pagination_class = PositionPagination
+
+    def get_queryset(self):
+        params = self.request.query_params
+        if 'category' in params and 'genre' in params:
+            raise ValidationError(
+                'Укажите что-то одно: category или genre.')
+        category = genre = None
+        if 'category' in params:
+            category = get_object_or_404(Category, slug=params['category'])
+        if 'genre' in params:
+            genre = get_object_or_404(Genre, slug=params['genre'])
+        return TitleRank.objects.filter(
+            board=self.kwargs['board'], category=category, genre=genre
+        ).select_related('title__category').prefetch_related('title__genre')
+
+
+class ReviewViewSet(
+    ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet
+):
     permission_classes = [IsAdminOrModeratorOrAuthor]
     pagination_class = PageNumberPagination
+    cursor_pagination_class = ParentingCursorPagination
     serializer_class = ReviewSerializer
+    fast_rows = ReviewRows()
+    filter_backends = (StableOrderingFilter,)
+    ordering_fields = (
+        'pub_date', 'score', 'comments_count', 'last_comment_at')
+    ordering = ParentingCursorPagination.ordering
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            cursor_paginator = self.cursor_pagination_class()
+            self._paginator = (
+                cursor_paginator
+                if cursor_paginator.is_requested(self.request)
+                else self.pagination_class()
+            )
+        return self._paginator
+
+    def get_title(self):
+        """Произведение из URL; ищется один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id'))
+        return self._title
 
-    def title_query(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+    def get_object(self):
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+    def get_last_modified(self):
+        # Отзыв и произведение обновляют updated_at при изменении
+        # своих комментариев и отзывов соответственно.
+        if self.action == 'retrieve':
+            return self.get_object().updated_at
+        if self.action == 'list':
+            return self.get_title().updated_at
+        return None
+
+    def perform_destroy(self, instance):
+        # Комментарии удаляются каскадом, их счётчики сдвигаются
+        # одним UPDATE на автора, а не по запросу на комментарий.
+        with transaction.atomic(), batched_updates():
+            super().perform_destroy(instance)
 
     def get_queryset(self):
-        return self.title_query().reviews.all()
+        if self.detail:
+            # Отсутствие отзыва или произведения одинаково даёт 404.
+            queryset = Review.objects.filter(
+                title_id=self.kwargs.get('title_id'))
+        else:
+            queryset = self.get_title().reviews.all()
+        return queryset.select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.title_query())
+        try:
+            serializer.save(
+                author_id=self.request.user.id, title=self.get_title())
+        except IntegrityError:
+            if not Review.objects.filter(
+                    title=self.get_title(),
+                    author_id=self.request.user.id).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    settings.DUPLICATE_REVIEW_MESSAGE]
+            })
 
 
 class CommentViewSet(ReviewViewSet):
     serializer_class = CommentSerializer
+    fast_rows = CommentRows()
+    ordering_fields = ('pub_date',)
+
+    def get_review(self):
+        """Отзыв из URL; ищется один раз за запрос."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id'))
+        return self._review
 
-    def review_query(self):
-        return get_object_or_404(Review, id=self.kwargs.get('review_id'))
+    def get_last_modified(self):
+        if self.action == 'list':
+            return self.get_review().updated_at
+        return super().get_last_modified()
 
     def get_queryset(self):
-        return self.review_query().comments.all()
+        if self.detail:
+            queryset = Comment.objects.filter(
+                review_id=self.kwargs.get('review_id'),
+                review__title_id=self.kwargs.get('title_id'))
+        else:
+            queryset = self.get_review().comments.all()
+        return queryset.select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.review_query())
+        serializer.save(
+            author_id=self.request.user.id, review=self.get_review())
@@ -32,6 +32,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
+    'api.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -43,6 +45,12 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'api_yamdb.urls'
 
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', default='1') == '1'
+# Порог в секундах для журнала медленных запросов; пустое значение отключает журнал.
+SLOW_REQUEST_THRESHOLD = os.getenv('SLOW_REQUEST_THRESHOLD', default='1')
+SLOW_REQUEST_THRESHOLD = float(SLOW_REQUEST_THRESHOLD) if SLOW_REQUEST_THRESHOLD else None
+SLOW_REQUEST_TOP_QUERIES = 5
+
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 TEMPLATES = [
     {
@@ -62,6 +70,13 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+# none — соединение на каждый запрос, persistent — соединение живёт
+# DB_CONN_MAX_AGE секунд в своём потоке, pgbouncer — то же через пулер.
+DB_POOL_MODE = os.getenv('DB_POOL_MODE', default='persistent')
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', default=60))
+# Проверять переиспользуемое соединение в начале запроса.
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', default='1') == '1'
+
 if DEBUG:
     DATABASES = {
         'default': {
@@ -77,10 +92,51 @@ else:
             'USER': os.getenv('POSTGRES_USER', default='postgres'),
             'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
             'HOST': os.getenv('DB_HOST', default='db'),
-            'PORT': os.getenv('DB_PORT', default='5432')
+            'PORT': os.getenv('DB_PORT', default='5432'),
+            'CONN_MAX_AGE': 0 if DB_POOL_MODE == 'none' else DB_CONN_MAX_AGE,
+            # pgbouncer в режиме transaction не держит серверные курсоры.
+            'DISABLE_SERVER_SIDE_CURSORS': DB_POOL_MODE == 'pgbouncer',
         }
     }
 
+# Реплики для чтения: хосты через запятую, для SQLite — пути к файлам.
+# Пустое значение — всё читается из default.
+DB_REPLICAS = [
+    location for location in os.getenv('DB_REPLICAS', default='').split(',')
+    if location
+]
+DATABASE_REPLICAS = []
+for number, location in enumerate(DB_REPLICAS, 1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        ('NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3')
+         else 'HOST'): location,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['api.db.ReplicaRouter']
+# Число процессов gunicorn; gunicorn.conf.py передаёт его приложению.
+WEB_WORKERS = int(os.getenv('WEB_WORKERS', default=1))
+# Сколько секунд после записи клиент читает с основной базы.
+DB_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', default=5))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    }
+}
+
+# Списки произведений, отзывов и комментариев через .values() без сериализаторов.
+FAST_LIST_SERIALIZATION = os.getenv('FAST_LIST_SERIALIZATION', default='1') == '1'
+
+# При нескольких процессах gunicorn кэш каталога и закрепления за основной
+# базой работают только с общим кэшем (memcached): см. api.cache.check_shared_cache.
+CATALOG_CACHE = os.getenv('CATALOG_CACHE', default='1') == '1'
+CATALOG_CACHE_ALIAS = 'default'
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', default=300))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -118,15 +174,31 @@ AUTH_USER_MODEL = 'users.CustomUser'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 5
+    'PAGE_SIZE': 5,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.WriteRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': os.getenv('THROTTLE_SIGNUP_RATE', default='10/hour'),
+        'token': os.getenv('THROTTLE_TOKEN_RATE', default='30/hour'),
+        'writes': os.getenv('THROTTLE_WRITES_RATE', default='120/min'),
+    },
+    # Адрес клиента берётся из X-Forwarded-For, который выставляет nginx.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
 }
 
+# local — счётчики в памяти процесса (лимит на каждый процесс gunicorn),
+# cache — в кэше THROTTLE_CACHE_ALIAS, общем для процессов (memcached).
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', default='local')
+THROTTLE_CACHE_ALIAS = 'default'
+THROTTLE_LOCAL_MAX_KEYS = 100000
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -158,10 +230,16 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
+JWT_USER_CACHE_TTL = 60
+JWT_USER_CACHE_SIZE = 10000
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 CONTACT_EMAIL = os.getenv('CONTACT_EMAIL')
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 30
+EMAIL_OUTBOX_POLL_INTERVAL = 5
 
 CONFIRMATION_CODE_LEN = 5
 USER = 'user'
@@ -174,10 +252,20 @@ USER_NAMES_LENGTH = 150
 EMAIL_LENGTH = 254
 MIN_SCORE = 1
 MAX_SCORE = 10
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_ERRORS = 1000
+FIXTURE_CHUNK_SIZE = 1000
+LEADERBOARD_SIZE = 1000
+MODERATION_CHUNK_SIZE = 500
+LEADERBOARD_PRIOR_WEIGHT = 10
+LEADERBOARD_TRENDING_DAYS = 7
+# Начиная с этого числа строк админка берёт его из статистики PostgreSQL.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100000
 
 SLUG_PATTERN = r'^[-a-zA-Z0-9_]+$'
 USERNAME_PATTERN = r'^[\w.@+-]+$'
 DUPLICATE_EMAIL_MESSAGE = 'Пользователь с таким email уже зарегистрирован, но указан неверный username.'
+DUPLICATE_REVIEW_MESSAGE = 'Больше одного отзыва на title писать нельзя'
 DUPLICATE_USERNAME_MESSAGE = 'Пользователь с таким username уже зарегистрирован, но указан неверный email.'
 SLUG_ERROR_MESSAGE = f'Адрес категории не соответствует шаблону: {SLUG_PATTERN}'
 NAME_ME_ERROR_MESSAGE = 'Запрещено использовать "me" в качестве никнейма'
@@ -0,0 +1,13 @@
+"""Настройки pytest: база SQLite в памяти вместо PostgreSQL."""
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+DATABASE_REPLICAS = []
+# В репозитории нет файлов миграций: схема создаётся через run_syncdb.
+MIGRATION_MODULES = {'users': None, 'reviews': None, 'api': None}
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -0,0 +1,16 @@
+import os
+
+bind = os.getenv('GUNICORN_BIND', default='0:8000')
+# Один процесс, как до появления этого файла. Каждый поток держит
+# соединение с базой, поэтому число процессов подбирается под её лимит
+# соединений (см. README), а не под число ядер.
+workers = int(os.getenv('GUNICORN_WORKERS', default=1))
+# Настройки Django проверяют по нему, что кэш общий для процессов.
+os.environ['WEB_WORKERS'] = str(workers)
+# sync — процесс на запрос; gthread — несколько потоков в процессе,
+# пока один поток ждёт базу, другие обслуживают запросы.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', default='sync')
+threads = int(os.getenv('GUNICORN_THREADS', default=1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', default=30))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', default=1000))
+max_requests_jitter = max_requests // 10
@@ -1,17 +1,29 @@
 from django.contrib import admin
 
 from .models import Category, Comment, Genre, Review, Title
+from .paginators import EstimatedCountPaginator
 
 
-class ReviewAdmin(admin.ModelAdmin):
-    list_display = ('title', 'text', 'score')
-    search_fields = ('title',)
+class LargeTableAdmin(admin.ModelAdmin):
+    """Список большой таблицы: без точного COUNT(*) там, где он дорог."""
+    paginator = EstimatedCountPaginator
+    # Иначе отфильтрованный список ещё раз считает всю таблицу.
+    show_full_result_count = False
+
+
+class ReviewAdmin(LargeTableAdmin):
+    list_display = ('title', 'author', 'text', 'score')
+    list_select_related = ('title', 'author')
+    search_fields = ('title__name', 'text')
     list_filter = ('score',)
+    raw_id_fields = ('title', 'author')
 
 
-class CommentAdmin(admin.ModelAdmin):
-    list_display = ('review', 'text')
-    search_fields = ('review',)
+class CommentAdmin(LargeTableAdmin):
+    list_display = ('review', 'author', 'text')
+    list_select_related = ('review', 'author')
+    search_fields = ('review__text', 'text')
+    raw_id_fields = ('review', 'author')
 
 
 class GenreAdmin(admin.ModelAdmin):
@@ -22,13 +34,21 @@ class GenreAdmin(admin.ModelAdmin):
 class TabularInlineGenre(admin.TabularInline):
     model = Genre.titles.through
 
+    def get_queryset(self, request):
+        # Строки связей подписываются через str(жанр) и str(произведение).
+        return super().get_queryset(request).select_related('genre', 'title')
 
-class TitleAdmin(admin.ModelAdmin):
+
+class TitleAdmin(LargeTableAdmin):
     list_display = ('name', 'category', 'year', 'description', 'get_genres')
-    search_fields = ('name', 'category', 'year')
+    list_select_related = ('category',)
+    search_fields = ('name', 'category__name', 'year')
     list_filter = ('category', 'genre')
     inlines = (TabularInlineGenre, )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('genre')
+
     def get_genres(self, title):
         return ', '.join(genre.name for genre in title.genre.all())
 
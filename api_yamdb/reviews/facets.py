@@ -0,0 +1,118 @@
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, IntegerField
+
+from .models import Category, FacetCount, Genre, Title
+
+# Ширина корзины года: фасет year считает произведения по десятилетиям.
+YEAR_BUCKET = 10
+
+
+def decade(year):
+    return year // YEAR_BUCKET * YEAR_BUCKET
+
+
+def count_facet(facet, titles):
+    """Строки (фасет, значение, название, число) одним GROUP BY."""
+    # Сортировка Title по имени попала бы в GROUP BY и разбила группы.
+    titles = titles.order_by()
+    if facet == FacetCount.YEAR:
+        decade = ExpressionWrapper(
+            F('year') / YEAR_BUCKET * YEAR_BUCKET,
+            output_field=IntegerField())
+        return [
+            (facet, str(row['decade']), '', row['count'])
+            for row in titles.values(decade=decade).annotate(
+                count=Count('id', distinct=True)).order_by()
+        ]
+    return [
+        (facet, row[f'{facet}__slug'], row[f'{facet}__name'], row['count'])
+        for row in titles.filter(**{f'{facet}__isnull': False}).values(
+            f'{facet}__slug', f'{facet}__name').annotate(
+            count=Count('id', distinct=True)).order_by()
+    ]
+
+
+def count_facets(titles):
+    """Строки всех фасетов для набора произведений."""
+    return [
+        row for facet, _ in FacetCount.FACETS
+        for row in count_facet(facet, titles)
+    ]
+
+
+def stored_facets(*facets):
+    """Строки фасетов всего каталога из таблицы FacetCount."""
+    return list(FacetCount.objects.filter(facet__in=facets).values_list(
+        'facet', 'value', 'name', 'count'))
+
+
+def format_facets(rows):
+    """Ответ API: категории и жанры от частых к редким, годы по порядку."""
+    facets = {facet: [] for facet, _ in FacetCount.FACETS}
+    for facet, value, name, count in sorted(
+            rows, key=lambda row: (-row[3], row[1])):
+        if facet != FacetCount.YEAR:
+            facets[facet].append(
+                {'slug': value, 'name': name, 'count': count})
+    for value, count in sorted(
+            (int(value), count) for facet, value, _, count in rows
+            if facet == FacetCount.YEAR):
+        facets[FacetCount.YEAR].append({
+            'from': value, 'to': value + YEAR_BUCKET - 1, 'count': count})
+    return facets
+
+
+def shift_facet(facet, value, name, delta):
+    """Сдвигает одну строку FacetCount; обнулённая строка удаляется."""
+    rows = FacetCount.objects.filter(facet=facet, value=value)
+    if delta < 0:
+        rows.filter(count__lte=-delta).delete()
+        rows.update(count=F('count') + delta)
+        return
+    if rows.update(count=F('count') + delta):
+        return
+    _, created = FacetCount.objects.get_or_create(
+        facet=facet, value=value, defaults={'name': name, 'count': delta})
+    if not created:
+        # Строку успела создать параллельная транзакция.
+        rows.update(count=F('count') + delta)
+
+
+def apply_facet_deltas(deltas):
+    """Сдвигает счётчики фасетов: deltas — {(фасет, ключ): ±число}.
+
+    Ключ — id категории или жанра либо первый год десятилетия.
+    """
+    values = {}
+    for facet, model in ((FacetCount.CATEGORY, Category),
+                         (FacetCount.GENRE, Genre)):
+        ids = {key for (name, key), delta in deltas.items()
+               if name == facet and delta}
+        if ids:
+            values.update(
+                ((facet, pk), (slug, name)) for pk, slug, name in
+                model.objects.filter(pk__in=ids).values_list(
+                    'id', 'slug', 'name'))
+    values.update(
+        ((facet, key), (str(key), '')) for facet, key in deltas
+        if facet == FacetCount.YEAR)
+    for (facet, key), delta in sorted(deltas.items(), key=str):
+        # Сортировка задаёт общий порядок блокировок строк.
+        if delta and (facet, key) in values:
+            shift_facet(facet, *values[facet, key], delta)
+
+
+def refresh_facets():
+    """Пересчитывает таблицу FacetCount, возвращает число строк.
+
+    Нужен после загрузки данных без сигналов; в остальных случаях
+    счётчики сдвигает apply_facet_deltas.
+    """
+    facets = [
+        FacetCount(facet=facet, value=value, name=name, count=count)
+        for facet, value, name, count in count_facets(Title.objects.all())
+    ]
+    with transaction.atomic():
+        FacetCount.objects.all().delete()
+        FacetCount.objects.bulk_create(facets, batch_size=1000)
+    return len(facets)
@@ -0,0 +1,202 @@
+import json
+import tempfile
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from itertools import islice
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router, transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+
+from .signals import titles_bulk_created
+
+# Модели в порядке зависимостей: сначала те, на кого ссылаются.
+LOAD_ORDER = (
+    'users.customuser',
+    'reviews.category',
+    'reviews.genre',
+    'reviews.title',
+    'reviews.genretitle',
+    'reviews.review',
+    'reviews.comment',
+)
+FORMATS = ('json', 'jsonl')
+READ_SIZE = 64 * 1024
+
+
+def iter_json_array(stream):
+    """Отдаёт элементы JSON-массива верхнего уровня по одному.
+
+    Файл читается блоками, в памяти держится только текущий объект.
+    """
+    decoder = json.JSONDecoder()
+    buffer = stream.read(READ_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError('Фикстура должна быть JSON-массивом')
+    position = 1
+    eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = stream.read(READ_SIZE)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield item
+        position = end
+
+
+def read_objects(stream, file_format):
+    if file_format == 'json':
+        yield from iter_json_array(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+@contextmanager
+def keep_auto_dates(model):
+    """Не даёт auto_now/auto_now_add затереть даты из фикстуры.
+
+    Отдаёт список таких полей: в старых фикстурах их может не быть.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield fields
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def load_fixture(stream, file_format, chunk_size):
+    """Загружает фикстуру пачками bulk_create в порядке зависимостей.
+
+    Объекты сначала раскладываются по временным файлам моделей,
+    поэтому порядок записей в самой фикстуре не важен. Возвращает
+    счётчики загруженных и пропущенных объектов по моделям.
+    """
+    loaded, skipped = Counter(), Counter()
+    with ExitStack() as stack:
+        spools = {}
+        for obj in read_objects(stream, file_format):
+            label = obj['model'].lower()
+            if label not in LOAD_ORDER:
+                skipped[label] += 1
+                continue
+            if label not in spools:
+                spools[label] = stack.enter_context(
+                    tempfile.TemporaryFile('w+', encoding='utf-8'))
+            spools[label].write(json.dumps(obj) + '\n')
+        models = [apps.get_model(label) for label in LOAD_ORDER
+                  if label in spools]
+        db = router.db_for_write(models[0]) if models else 'default'
+        with transaction.atomic(using=db):
+            for model in models:
+                spool = spools[model._meta.label_lower]
+                spool.seek(0)
+                loaded[model._meta.label_lower] = load_model(
+                    model, spool, chunk_size, db)
+            reset_sequences(models, db)
+    return loaded, skipped
+
+
+def load_model(model, spool, chunk_size, db):
+    count = 0
+    lines = iter(spool)
+    now = timezone.now()
+    with keep_auto_dates(model) as date_fields:
+        while True:
+            chunk = [json.loads(line) for line in islice(lines, chunk_size)]
+            if not chunk:
+                return count
+            objects, m2m = [], []
+            for deserialized in serializers.deserialize(
+                    'python', chunk, using=db, ignorenonexistent=True):
+                for field in date_fields:
+                    if getattr(deserialized.object, field.attname) is None:
+                        setattr(deserialized.object, field.attname, now)
+                objects.append(deserialized.object)
+                m2m.append(deserialized.m2m_data)
+            model.objects.using(db).bulk_create(objects)
+            save_m2m(model, objects, m2m, db)
+            if model._meta.label_lower == 'reviews.title':
+                titles_bulk_created.send(sender=model, titles=objects)
+            count += len(objects)
+
+
+def save_m2m(model, objects, m2m, db):
+    """Записывает связи many-to-many через bulk_create промежуточной модели."""
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        if not through._meta.auto_created:
+            # Такие связи выгружаются отдельной моделью, например GenreTitle.
+            continue
+        source = field.m2m_field_name() + '_id'
+        target = field.m2m_reverse_field_name() + '_id'
+        through.objects.using(db).bulk_create(
+            through(**{source: obj.pk, target: related_pk})
+            for obj, data in zip(objects, m2m)
+            for related_pk in data.get(field.name, ())
+        )
+
+
+def reset_sequences(models, db):
+    connection = connections[db]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def dump_fixture(stream, file_format, chunk_size):
+    """Выгружает модели проекта, не загружая таблицы в память целиком."""
+    counts = Counter()
+    first = True
+    if file_format == 'json':
+        stream.write('[')
+    for label in LOAD_ORDER:
+        model = apps.get_model(label)
+        m2m_fields = [
+            field.name for field in model._meta.many_to_many
+            if field.remote_field.through._meta.auto_created
+        ]
+        queryset = model._default_manager.order_by('pk')
+        objects = queryset.iterator(chunk_size=chunk_size)
+        while True:
+            chunk = list(islice(objects, chunk_size))
+            if not chunk:
+                break
+            # iterator() не поддерживает prefetch_related.
+            prefetch_related_objects(chunk, *m2m_fields)
+            for data in serializers.serialize('python', chunk):
+                line = json.dumps(data, cls=DjangoJSONEncoder,
+                                  ensure_ascii=False)
+                if file_format == 'jsonl':
+                    stream.write(line + '\n')
+                else:
+                    stream.write(('' if first else ',\n') + line)
+                first = False
+            counts[label] += len(chunk)
+    if file_format == 'json':
+        stream.write(']\n')
+    return counts
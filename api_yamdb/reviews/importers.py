@@ -0,0 +1,196 @@
+import codecs
+import csv
+import json
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+from reviews.models import Category, Genre, GenreTitle, Title
+from reviews.signals import titles_bulk_created
+from reviews.validators import validate_year
+
+FORMATS = ('csv', 'jsonl')
+ENCODING = 'utf-8'
+
+
+def get_format(filename, file_format=None):
+    """Формат файла: явно указанный или по расширению."""
+    file_format = file_format or filename.rsplit('.', 1)[-1].lower()
+    if file_format not in FORMATS:
+        raise ValueError(
+            f'Поддерживаемые форматы: {", ".join(FORMATS)}')
+    return file_format
+
+
+def check_encoding(stream, block_size=64 * 1024):
+    """Проверяет кодировку всего файла до импорта.
+
+    Иначе ошибка декодирования в середине файла прервала бы импорт
+    после уже сохранённых пачек. Возвращает поток в начало.
+    """
+    decoder = codecs.getincrementaldecoder(ENCODING)()
+    for block in iter(partial(stream.read, block_size), b''):
+        decoder.decode(block)
+    decoder.decode(b'', final=True)
+    stream.seek(0)
+
+
+def read_rows(stream, file_format):
+    """Построчно читает произведения из CSV или JSONL.
+
+    Отдаёт пары (номер строки, словарь полей); жанры в CSV
+    перечисляются через запятую в колонке genre.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            genre = row.get('genre') or ''
+            row['genre'] = [slug.strip() for slug in genre.split(',')
+                            if slug.strip()]
+            yield reader.line_num, row
+        return
+    for line_num, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            row = {'_error': f'Некорректный JSON: {error}'}
+        if not isinstance(row, dict):
+            row = {'_error': 'Ожидается объект JSON.'}
+        yield line_num, row
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, line_num, errors):
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append({'line': line_num, 'errors': errors})
+
+    def as_dict(self):
+        return {'created': self.created, 'errors': self.errors}
+
+
+def import_titles(rows, chunk_size=settings.IMPORT_CHUNK_SIZE):
+    """Создаёт произведения пачками, не прерываясь на ошибочных строках."""
+    result = ImportResult()
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return result
+        import_chunk(chunk, result)
+
+
+def import_chunk(chunk, result):
+    categories = {
+        category.slug: category for category in Category.objects.filter(
+            slug__in={row.get('category') for _, row in chunk
+                      if isinstance(row.get('category'), str)})
+    }
+    genre_slugs = set()
+    for _, row in chunk:
+        if isinstance(row.get('genre'), list):
+            genre_slugs.update(
+                slug for slug in row['genre'] if isinstance(slug, str))
+    genres = dict(
+        Genre.objects.filter(slug__in=genre_slugs).values_list('slug', 'id'))
+    titles, title_genres = [], []
+    for line_num, row in chunk:
+        errors = {}
+        title = build_title(row, categories, errors)
+        genre_ids = clean_genres(row, genres, errors)
+        if errors:
+            result.add_error(line_num, errors)
+            continue
+        titles.append(title)
+        title_genres.append(genre_ids)
+    with transaction.atomic():
+        save_titles(titles)
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title_id=title.id, genre_id=genre_id)
+            for title, genre_ids in zip(titles, title_genres)
+            for genre_id in genre_ids
+        )
+        if titles:
+            titles_bulk_created.send(sender=Title, titles=titles)
+    result.created += len(titles)
+
+
+def build_title(row, categories, errors):
+    if '_error' in row:
+        errors['non_field_errors'] = [row['_error']]
+        return None
+    name = row.get('name')
+    if not isinstance(name, str) or not name.strip():
+        errors['name'] = ['Обязательное поле.']
+    elif len(name) > settings.NAME_LENGTH:
+        errors['name'] = [
+            f'Не более {settings.NAME_LENGTH} символов.']
+    try:
+        year = int(row.get('year'))
+        validate_year(year)
+    except (TypeError, ValueError):
+        errors['year'] = ['Требуется целое число.']
+    except ValidationError as error:
+        errors['year'] = error.messages
+    description = row.get('description') or None
+    if description is not None and not isinstance(description, str):
+        errors['description'] = ['Ожидается строка.']
+    category = clean_category(row, categories, errors)
+    if errors:
+        return None
+    return Title(
+        name=name,
+        year=year,
+        description=description,
+        category=category,
+    )
+
+
+def clean_category(row, categories, errors):
+    slug = row.get('category')
+    if not slug:
+        return None
+    if not isinstance(slug, str):
+        errors['category'] = ['Ожидается slug категории.']
+        return None
+    category = categories.get(slug)
+    if category is None:
+        errors['category'] = [f'Категории {slug} не существует.']
+    return category
+
+
+def clean_genres(row, genres, errors):
+    slugs = row.get('genre') or []
+    if not isinstance(slugs, list):
+        errors['genre'] = ['Ожидается список slug жанров.']
+        return []
+    if not all(isinstance(slug, str) for slug in slugs):
+        errors['genre'] = ['Slug жанра должен быть строкой.']
+        return []
+    missing = [slug for slug in slugs if slug not in genres]
+    if missing:
+        errors['genre'] = [
+            f'Жанров не существует: {", ".join(map(str, missing))}.']
+        return []
+    return {genres[slug] for slug in slugs}
+
+
+def save_titles(titles):
+    """Сохраняет произведения одним bulk_create и проставляет им id."""
+    db = router.db_for_write(Title)
+    Title.objects.using(db).bulk_create(titles)
+    if connections[db].features.can_return_ids_from_bulk_insert or not titles:
+        return
+    # SQLite не возвращает id после bulk_create, но держит блокировку
+    # записи до конца транзакции: последние id принадлежат этой пачке.
+    ids = Title.objects.using(db).order_by('-id').values_list(
+        'id', flat=True)[:len(titles)]
+    for title, pk in zip(titles, reversed(list(ids))):
+        title.pk = pk
@@ -0,0 +1,90 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import GenreTitle, Review, Title, TitleRank
+
+
+def bayesian_score(score_sum, score_count, mean, weight):
+    """Средняя оценка, стянутая к средней по каталогу.
+
+    Пока у произведения мало отзывов, weight воображаемых оценок mean
+    перевешивают его собственные.
+    """
+    return (weight * mean + score_sum) / (weight + score_count)
+
+
+def catalog_mean():
+    totals = Title.objects.aggregate(
+        score_sum=Sum('rating_sum'), score_count=Sum('rating_count'))
+    if not totals['score_count']:
+        return 0
+    return totals['score_sum'] / totals['score_count']
+
+
+def top_stats():
+    """(id, категория, сумма, количество) оценок по хранимым счётчикам."""
+    return Title.objects.filter(rating_count__gt=0).values_list(
+        'id', 'category_id', 'rating_sum', 'rating_count').iterator()
+
+
+def trending_stats(since):
+    """То же по отзывам, оставленным после since."""
+    return Review.objects.filter(pub_date__gte=since).values_list(
+        'title_id', 'title__category_id').annotate(
+        score_sum=Sum('score'), score_count=Count('id')).order_by().iterator()
+
+
+def build_board(board, stats, mean, genres):
+    """Позиции общего рейтинга и рейтингов по категориям и жанрам."""
+    scored = sorted(
+        (
+            (round(bayesian_score(score_sum, score_count, mean,
+                                  settings.LEADERBOARD_PRIOR_WEIGHT), 3),
+             score_count, title_id, category_id)
+            for title_id, category_id, score_sum, score_count in stats
+        ),
+        key=lambda row: (-row[0], -row[1], row[2]),
+    )
+    positions = defaultdict(int)
+    for score, score_count, title_id, category_id in scored:
+        scopes = [(None, None)]
+        if category_id is not None:
+            scopes.append((category_id, None))
+        scopes.extend((None, genre_id) for genre_id in genres[title_id])
+        for scope in scopes:
+            if positions[scope] >= settings.LEADERBOARD_SIZE:
+                continue
+            positions[scope] += 1
+            yield TitleRank(
+                board=board,
+                category_id=scope[0],
+                genre_id=scope[1],
+                position=positions[scope],
+                title_id=title_id,
+                score=score,
+                reviews=score_count,
+            )
+
+
+def refresh_leaderboards(now=None):
+    """Пересобирает таблицу TitleRank, возвращает число позиций."""
+    since = (now or timezone.now()) - timedelta(
+        days=settings.LEADERBOARD_TRENDING_DAYS)
+    mean = catalog_mean()
+    genres = defaultdict(list)
+    for title_id, genre_id in GenreTitle.objects.filter(
+            genre__isnull=False).values_list('title_id', 'genre_id'):
+        genres[title_id].append(genre_id)
+    ranks = [
+        *build_board(TitleRank.TOP, top_stats(), mean, genres),
+        *build_board(TitleRank.TRENDING, trending_stats(since), mean, genres),
+    ]
+    with transaction.atomic():
+        TitleRank.objects.all().delete()
+        TitleRank.objects.bulk_create(ranks, batch_size=1000)
+    return len(ranks)
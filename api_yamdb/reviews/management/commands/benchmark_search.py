@@ -0,0 +1,64 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.models import Title
+from reviews.search import rebuild_search_index, search_titles
+
+SYLLABLES = ('ка', 'ро', 'ми', 'ту', 'ле', 'на', 'во', 'зе', 'ry', 'st')
+WORDS = tuple(
+    first + second + third
+    for first in SYLLABLES for second in SYLLABLES for third in SYLLABLES
+)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время поиска произведений по индексу и через '
+            'LIKE на синтетических данных. Данные откатываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+            help='Размеры таблицы произведений.')
+        parser.add_argument(
+            '--queries', type=int, default=50,
+            help='Сколько поисковых запросов выполнить на каждом размере.')
+
+    def handle(self, *args, **options):
+        self.stdout.write('size\tindex_ms\tcontains_ms')
+        random.seed(0)
+        for size in options['sizes']:
+            with transaction.atomic():
+                self.fill(size)
+                terms = [random.choice(WORDS)
+                         for _ in range(options['queries'])]
+                indexed = self.measure(
+                    terms, lambda term: search_titles(
+                        Title.objects.all(), term))
+                contains = self.measure(
+                    terms, lambda term: Title.objects.filter(
+                        name__contains=term))
+                transaction.set_rollback(True)
+            self.stdout.write(f'{size}\t{indexed:.2f}\t{contains:.2f}')
+
+    def fill(self, size):
+        titles = (
+            Title(name=' '.join(random.sample(WORDS, 3)), year=2000)
+            for _ in range(size)
+        )
+        batch = []
+        for title in titles:
+            batch.append(title)
+            if len(batch) == 1000:
+                Title.objects.bulk_create(batch)
+                batch = []
+        Title.objects.bulk_create(batch)
+        rebuild_search_index()
+
+    def measure(self, terms, make_queryset):
+        """Среднее время первой страницы выдачи, мс."""
+        started = time.perf_counter()
+        for term in terms:
+            list(make_queryset(term)[:10])
+        return (time.perf_counter() - started) / len(terms) * 1000
@@ -0,0 +1,31 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from reviews.fixture_stream import FORMATS, dump_fixture
+
+
+class Command(BaseCommand):
+    help = ('Потоково выгружает пользователей, категории, жанры, '
+            'произведения, отзывы и комментарии в фикстуру.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-o', '--output',
+            help='Файл для выгрузки; по умолчанию stdout.')
+        parser.add_argument(
+            '--format', dest='file_format', choices=FORMATS,
+            default='json', help='JSON-массив (для loaddata) или JSONL.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.FIXTURE_CHUNK_SIZE,
+            help='Сколько объектов читать из базы за раз.')
+
+    def handle(self, *args, **options):
+        if options['output'] is None:
+            counts = dump_fixture(
+                sys.stdout, options['file_format'], options['chunk_size'])
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                counts = dump_fixture(
+                    stream, options['file_format'], options['chunk_size'])
+        self.stderr.write(f'Выгружено объектов: {sum(counts.values())}')
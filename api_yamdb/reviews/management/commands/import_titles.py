@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from reviews.importers import (ENCODING, FORMATS, check_encoding, get_format,
+                               import_titles, read_rows)
+
+
+class Command(BaseCommand):
+    help = 'Загружает произведения из CSV или JSONL пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу с произведениями.')
+        parser.add_argument(
+            '--format', dest='file_format', choices=FORMATS,
+            help='Формат файла; по умолчанию определяется по расширению.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.IMPORT_CHUNK_SIZE,
+            help='Сколько строк обрабатывать за одну пачку.')
+
+    def handle(self, *args, **options):
+        try:
+            file_format = get_format(options['path'], options['file_format'])
+        except ValueError as error:
+            raise CommandError(error)
+        with open(options['path'], 'rb') as stream:
+            try:
+                check_encoding(stream)
+            except UnicodeDecodeError:
+                raise CommandError(f'Файл должен быть в кодировке {ENCODING}.')
+        with open(options['path'], encoding=ENCODING, newline='') as stream:
+            result = import_titles(
+                read_rows(stream, file_format), options['chunk_size'])
+        for error in result.errors:
+            self.stderr.write(f'Строка {error["line"]}: {error["errors"]}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано произведений: {result.created}, '
+            f'строк с ошибками: {len(result.errors)}'))
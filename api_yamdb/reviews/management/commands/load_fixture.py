@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from reviews.fixture_stream import FORMATS, load_fixture
+
+
+class Command(BaseCommand):
+    help = ('Потоково загружает фикстуру (JSON-массив или JSONL) '
+            'пачками bulk_create в порядке зависимостей моделей.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к фикстуре.')
+        parser.add_argument(
+            '--format', dest='file_format', choices=FORMATS,
+            help='Формат файла; по умолчанию определяется по расширению.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.FIXTURE_CHUNK_SIZE,
+            help='Сколько объектов сохранять за один bulk_create.')
+
+    def handle(self, *args, **options):
+        file_format = (
+            options['file_format'] or options['path'].rsplit('.', 1)[-1])
+        if file_format not in FORMATS:
+            raise CommandError(
+                f'Поддерживаемые форматы: {", ".join(FORMATS)}')
+        with open(options['path'], encoding='utf-8') as stream:
+            loaded, skipped = load_fixture(
+                stream, file_format, options['chunk_size'])
+        for label, count in loaded.items():
+            self.stdout.write(f'{label}: {count}')
+        for label, count in skipped.items():
+            self.stdout.write(f'{label}: пропущено {count}')
+        if loaded['reviews.review']:
+            # Рейтинг в старых фикстурах не хранится.
+            call_command('rebuild_ratings', stdout=self.stdout)
+        if loaded['reviews.review'] or loaded['reviews.comment']:
+            call_command('rebuild_user_stats', stdout=self.stdout)
+            call_command('rebuild_comment_counts', stdout=self.stdout)
+        if loaded['reviews.title'] or loaded['reviews.genretitle']:
+            # Связи с жанрами загружаются пачками без сигналов.
+            call_command('refresh_facets', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {sum(loaded.values())}'))
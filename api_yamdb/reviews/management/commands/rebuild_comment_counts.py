@@ -0,0 +1,25 @@
+from django.db.models import Count, Max
+from reviews.management.rebuild import RebuildCountersCommand, grouped
+from reviews.models import Comment, Review
+
+
+class Command(RebuildCountersCommand):
+    help = ('Пересчитывает число комментариев и дату последнего '
+            'комментария отзывов и сообщает о расхождениях.')
+    model = Review
+    counters = Review.COMMENT_COUNTERS
+    empty = {'last_comment_at': None}
+
+    def get_actual(self):
+        return {
+            row['review']: {'comments_count': row['count'],
+                            'last_comment_at': row['last']}
+            for row in grouped(Comment.objects, 'review',
+                               count=Count('id'), last=Max('pub_date'))
+        }
+
+    def describe(self, review, expected):
+        return (
+            f'Отзыв {review.id}: хранится {review.comments_count}, '
+            f'по комментариям {expected["comments_count"]}'
+        )
@@ -0,0 +1,31 @@
+from collections import Counter, defaultdict
+
+from django.db.models import Count
+from reviews.management.rebuild import RebuildCountersCommand, grouped
+from reviews.models import Review, Title, score_field
+
+
+class Command(RebuildCountersCommand):
+    help = ('Пересчитывает хранимый рейтинг и гистограмму оценок '
+            'произведений по отзывам и сообщает о расхождениях.')
+    model = Title
+    counters = Title.RATING_COUNTERS
+    fixed_label = 'Исправлено рейтингов'
+
+    def get_actual(self):
+        actual = defaultdict(Counter)
+        for row in grouped(Review.objects, 'title', 'score',
+                           score_count=Count('id')):
+            counters = actual[row['title']]
+            counters['rating_sum'] += row['score'] * row['score_count']
+            counters['rating_count'] += row['score_count']
+            counters[score_field(row['score'])] = row['score_count']
+        return actual
+
+    def describe(self, title, expected):
+        return (
+            f'Произведение {title.id}: хранится '
+            f'{title.rating_sum}/{title.rating_count}, '
+            f'по отзывам {expected["rating_sum"]}/'
+            f'{expected["rating_count"]}'
+        )
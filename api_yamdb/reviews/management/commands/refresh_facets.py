@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from reviews.facets import refresh_facets
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает число произведений по категориям, жанрам '
+            'и десятилетиям для фильтра каталога.')
+
+    def handle(self, *args, **options):
+        count = refresh_facets()
+        self.stdout.write(self.style.SUCCESS(f'Значений фильтров: {count}'))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from reviews.leaderboards import refresh_leaderboards
+
+
+class Command(BaseCommand):
+    help = ('Пересобирает рейтинги лучших и популярных произведений: '
+            'общий, по категориям и по жанрам.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help='Повторять каждые N секунд вместо одного запуска.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            count = refresh_leaderboards()
+            self.stdout.write(self.style.SUCCESS(
+                f'Позиций в рейтингах: {count} '
+                f'({time.monotonic() - started:.2f} с)'))
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
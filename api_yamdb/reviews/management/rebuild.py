@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+
+def grouped(queryset, *fields, **annotations):
+    """Агрегаты queryset по значениям fields одним GROUP BY."""
+    # order_by() убирает сортировку модели из GROUP BY.
+    return queryset.values(*fields).annotate(**annotations).order_by()
+
+
+class RebuildCountersCommand(BaseCommand):
+    """Сверяет хранимые счётчики модели с записями и исправляет их.
+
+    Наследник задаёт model, counters и get_actual(): словарь
+    {pk: {счётчик: значение}} по записям. Счётчик, которого в словаре нет,
+    берётся из empty, а если нет и там — равен нулю.
+    """
+    model = None
+    counters = ()
+    empty = {}
+    fixed_label = 'Исправлено счётчиков'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить расхождения, ничего не исправляя.',
+        )
+
+    def get_actual(self):
+        raise NotImplementedError
+
+    def describe(self, obj, expected):
+        raise NotImplementedError
+
+    def get_expected(self, actual, pk):
+        values = actual.get(pk, {})
+        return {name: values.get(name, self.empty.get(name, 0))
+                for name in self.counters}
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            actual = self.get_actual()
+            objects = self.model.objects.only(
+                'id', *self.counters).select_for_update()
+            drifted = []
+            for obj in objects.iterator():
+                expected = self.get_expected(actual, obj.id)
+                if all(getattr(obj, name) == value
+                       for name, value in expected.items()):
+                    continue
+                self.stdout.write(self.describe(obj, expected))
+                for name, value in expected.items():
+                    setattr(obj, name, value)
+                drifted.append(obj)
+            if not options['check']:
+                self.model.objects.bulk_update(
+                    drifted, self.counters, batch_size=500)
+        if options['check']:
+            if drifted:
+                raise CommandError(
+                    f'Расхождений найдено: {len(drifted)}')
+            self.stdout.write(self.style.SUCCESS('Расхождений нет'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'{self.fixed_label}: {len(drifted)}'))
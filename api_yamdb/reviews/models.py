@@ -1,9 +1,24 @@
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from reviews.validators import validate_slug, validate_year
 from users.models import CustomUser as User
 
+SCORES = range(settings.MIN_SCORE, settings.MAX_SCORE + 1)
+
+
+def score_field(score):
+    """Имя поля Title со счётчиком отзывов с оценкой score."""
+    return f'score_{score}_count'
+
+
+def score_counter(score):
+    return models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=f'Оценок {score}'
+    )
+
 
 class GenreCategory(models.Model):
     name = models.CharField(
@@ -67,6 +82,34 @@ class Title(models.Model):
         verbose_name='Жанры',
         help_text='Выберите жанр'
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество оценок'
+    )
+    # Гистограмма оценок: поле на каждую оценку SCORES, имя — score_field().
+    score_1_count = score_counter(1)
+    score_2_count = score_counter(2)
+    score_3_count = score_counter(3)
+    score_4_count = score_counter(4)
+    score_5_count = score_counter(5)
+    score_6_count = score_counter(6)
+    score_7_count = score_counter(7)
+    score_8_count = score_counter(8)
+    score_9_count = score_counter(9)
+    score_10_count = score_counter(10)
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+
+    RATING_COUNTERS = ('rating_sum', 'rating_count') + tuple(
+        score_field(score) for score in SCORES)
 
     class Meta:
         verbose_name = 'Произведение'
@@ -77,6 +120,45 @@ class Title(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Иначе сохранение затрёт рейтинг, который параллельно
+            # сдвинули отзывы.
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.RATING_COUNTERS
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def rating(self):
+        """Средняя оценка по хранимым сумме и количеству оценок."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum // self.rating_count
+
+    @property
+    def score_histogram(self):
+        """Количество отзывов по каждой оценке."""
+        return {score: getattr(self, score_field(score)) for score in SCORES}
+
+    @property
+    def rating_median(self):
+        """Медиана оценок по гистограмме."""
+        if not self.rating_count:
+            return None
+        middle = []
+        seen = 0
+        # Позиции средних оценок: одна при нечётном числе, две при чётном.
+        positions = {(self.rating_count - 1) // 2, self.rating_count // 2}
+        for score, count in self.score_histogram.items():
+            middle.extend(
+                score for position in sorted(positions)
+                if seen <= position < seen + count)
+            seen += count
+        return sum(middle) / len(middle)
+
 
 class GenreTitle(models.Model):
     """Произведения-Жанры."""
@@ -98,10 +180,11 @@ class ParentingModel(models.Model):
         on_delete=models.CASCADE,
     )
     pub_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         abstract = True
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
 
     def __str__(self):
         return self.text[:settings.SHORT_TEXT_LENGTH]
@@ -124,17 +207,58 @@ class Review(ParentingModel):
             (settings.MAX_SCORE - settings.MIN_SCORE) // 2 + settings.MIN_SCORE
         )
     )
+    # Ведут сигналы комментариев; сверяет rebuild_comment_counts.
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Комментариев'
+    )
+    last_comment_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Дата последнего комментария'
+    )
+
+    COMMENT_COUNTERS = ('comments_count', 'last_comment_at')
 
     class Meta(ParentingModel.Meta):
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         default_related_name = 'reviews'
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+            # Окно отзывов для рейтинга популярных произведений.
+            models.Index(fields=('pub_date',), name='review_pub_date_idx'),
+            # Лента активности пользователя.
+            models.Index(
+                fields=('author', 'pub_date', 'id'),
+                name='review_author_pub_date_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=('title', 'author',),
                 name='unique review'
             )]
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Иначе сохранение затрёт счётчики, которые параллельно
+            # сдвинули комментарии.
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COMMENT_COUNTERS
+            ]
+        # Рейтинг произведения обновляется сигналом post_save,
+        # поэтому он должен попасть в одну транзакцию с отзывом.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comment(ParentingModel):
     """Комментарии."""
@@ -147,3 +271,90 @@ class Comment(ParentingModel):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', 'pub_date', 'id'),
+                name='comment_author_pub_date_idx'
+            ),
+        ]
+
+
+class TitleRank(models.Model):
+    """Позиция произведения в материализованном рейтинге.
+
+    Рейтинг без category и genre общий, с ними — по категории или жанру.
+    Таблицу целиком пересобирает команда refresh_leaderboards.
+    """
+    TOP = 'top'
+    TRENDING = 'trending'
+    BOARDS = (
+        (TOP, 'Лучшие'),
+        (TRENDING, 'Популярные за период'),
+    )
+    board = models.CharField(max_length=16, choices=BOARDS)
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+    )
+    position = models.PositiveIntegerField()
+    title = models.ForeignKey(Title, on_delete=models.CASCADE)
+    score = models.FloatField(verbose_name='Взвешенная оценка')
+    reviews = models.PositiveIntegerField(verbose_name='Отзывов')
+
+    class Meta:
+        verbose_name = 'Позиция в рейтинге'
+        verbose_name_plural = 'Позиции в рейтинге'
+        default_related_name = 'ranks'
+        ordering = ('position',)
+        indexes = [
+            models.Index(
+                fields=('board', 'category', 'genre', 'position'),
+                name='title_rank_board_idx'
+            )]
+
+    def __str__(self):
+        return f'{self.board} {self.position}: {self.title_id}'
+
+
+class FacetCount(models.Model):
+    """Число произведений каталога без фильтров по значению фильтра.
+
+    value — slug категории или жанра либо первый год десятилетия.
+    Счётчики сдвигаются сигналами при изменениях каталога, таблицу
+    целиком пересчитывает команда refresh_facets.
+    """
+    CATEGORY = 'category'
+    GENRE = 'genre'
+    YEAR = 'year'
+    FACETS = (
+        (CATEGORY, 'Категория'),
+        (GENRE, 'Жанр'),
+        (YEAR, 'Десятилетие'),
+    )
+    facet = models.CharField(max_length=16, choices=FACETS)
+    value = models.CharField(max_length=settings.SLUG_LENGTH)
+    name = models.CharField(max_length=settings.NAME_LENGTH, blank=True)
+    count = models.PositiveIntegerField(verbose_name='Произведений')
+
+    class Meta:
+        verbose_name = 'Счётчик фильтра'
+        verbose_name_plural = 'Счётчики фильтров'
+        ordering = ('facet', '-count', 'value')
+        constraints = [
+            models.UniqueConstraint(
+                fields=('facet', 'value'), name='unique_facet_value')]
+
+    def __str__(self):
+        return f'{self.facet} {self.value}: {self.count}'
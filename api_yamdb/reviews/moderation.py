@@ -0,0 +1,24 @@
+from collections import Counter
+
+from django.db import transaction
+
+from .signals import batched_updates
+
+
+def delete_in_chunks(queryset, chunk_size):
+    """Удаляет записи queryset пачками, каждую в своей транзакции.
+
+    Рейтинги произведений и отметки об изменении отзывов обновляются
+    один раз на пачку, а не на каждую удалённую запись. Возвращает
+    число удалённых объектов по моделям, включая каскадные.
+    """
+    deleted = Counter()
+    while True:
+        with transaction.atomic(), batched_updates():
+            chunk = list(
+                queryset.order_by('pk').values_list('pk', flat=True)[
+                    :chunk_size])
+            if not chunk:
+                return deleted
+            _, counts = queryset.model.objects.filter(pk__in=chunk).delete()
+        deleted.update(counts)
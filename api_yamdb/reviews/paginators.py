@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_count(model, using):
+    """Оценка числа строк таблицы из статистики PostgreSQL или None."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [model._meta.db_table])
+        row = cursor.fetchone()
+    # До первого ANALYZE reltuples равен 0 или -1.
+    return None if row is None or row[0] < 0 else int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор админки без COUNT(*) по большим таблицам.
+
+    Для списка без фильтров и поиска берёт число строк из статистики
+    планировщика, если таблица больше ADMIN_ESTIMATED_COUNT_THRESHOLD.
+    Отфильтрованные списки и небольшие таблицы считаются точно.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if (estimate is not None
+                    and estimate > settings.ADMIN_ESTIMATED_COUNT_THRESHOLD):
+                return estimate
+        return super().count
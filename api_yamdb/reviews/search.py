@@ -0,0 +1,121 @@
+import re
+
+from django.db import OperationalError, connection, connections
+
+FTS_TABLE = 'reviews_title_fts'
+TRIGRAM_INDEX = 'reviews_title_name_trgm'
+
+# Есть ли в базе таблица FTS5: SQLite бывает собран без неё.
+_fts_tables = {}
+
+
+def has_fts(db):
+    """Поиск и индексация идут через FTS5, иначе — через LIKE."""
+    if db.vendor != 'sqlite':
+        return False
+    if db.alias not in _fts_tables:
+        with db.cursor() as cursor:
+            _fts_tables[db.alias] = (
+                FTS_TABLE in db.introspection.table_names(cursor))
+    return _fts_tables[db.alias]
+
+
+def create_search_index(using='default', **kwargs):
+    """Создаёт индекс поиска по названиям, если его ещё нет.
+
+    PostgreSQL: GIN-индекс pg_trgm по reviews_title.name.
+    SQLite: теневая таблица FTS5, заполняемая из reviews_title,
+    если SQLite собран с модулем fts5.
+    """
+    db = connections[using]
+    with db.cursor() as cursor:
+        if db.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} '
+                'ON reviews_title USING gin (name gin_trgm_ops)'
+            )
+        elif db.vendor == 'sqlite':
+            _fts_tables.pop(using, None)
+            if has_fts(db):
+                return
+            try:
+                cursor.execute(
+                    f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(name)')
+            except OperationalError:
+                # Без модуля fts5 поиск работает через LIKE.
+                return
+            _fts_tables[using] = True
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name) '
+                'SELECT id, name FROM reviews_title'
+            )
+
+
+def rebuild_search_index():
+    """Перестраивает таблицу FTS5 после массовой загрузки произведений."""
+    if not has_fts(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name) '
+            'SELECT id, name FROM reviews_title'
+        )
+
+
+def index_title(title):
+    index_titles([title])
+
+
+def index_titles(titles, replace=True):
+    if not has_fts(connection):
+        return
+    with connection.cursor() as cursor:
+        if replace:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                               [[title.pk] for title in titles])
+        cursor.executemany(f'INSERT INTO {FTS_TABLE} (rowid, name) '
+                           'VALUES (%s, %s)',
+                           [[title.pk, title.name] for title in titles])
+
+
+def unindex_title(title):
+    if not has_fts(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                       [title.pk])
+
+
+def search_titles(queryset, query):
+    """Фильтрует произведения по запросу и сортирует по релевантности.
+
+    В queryset добавляется поле search_rank: чем больше, тем лучше.
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return queryset.none()
+    db = connections[queryset.db]
+    if db.vendor == 'postgresql':
+        query = ' '.join(words)
+        queryset = queryset.extra(
+            select={'search_rank': 'word_similarity(%s, reviews_title.name)'},
+            select_params=[query],
+            where=['%s <%% reviews_title.name'],
+            params=[query],
+        )
+    elif has_fts(db):
+        match = ' '.join(f'"{word}"*' for word in words)
+        queryset = queryset.extra(
+            select={'search_rank': f'-bm25({FTS_TABLE})'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = reviews_title.id',
+                   f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+        )
+    else:
+        for word in words:
+            queryset = queryset.filter(name__icontains=word)
+        return queryset
+    return queryset.order_by('-search_rank')
@@ -0,0 +1,381 @@
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import (Count, DateTimeField, F, OuterRef, Q, Subquery,
+                              Value)
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save, pre_delete)
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .facets import apply_facet_deltas, decade
+from .models import (Category, Comment, FacetCount, Genre, GenreTitle, Review,
+                     Title, score_field)
+from .search import index_title, index_titles, unindex_title
+
+# Отправляется после bulk_create произведений, для которого Django
+# не шлёт post_save.
+titles_bulk_created = Signal(providing_args=['titles'])
+
+# Изменения, накопленные внутри batched_updates() в этом потоке.
+_batch = threading.local()
+
+
+def apply_rating_deltas(title_id, deltas):
+    """Одним UPDATE сдвигает счётчики оценок: deltas — {оценка: ±число}."""
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + sum(
+            score * delta for score, delta in deltas.items()),
+        rating_count=F('rating_count') + sum(deltas.values()),
+        updated_at=timezone.now(),
+        **{
+            score_field(score): F(score_field(score)) + delta
+            for score, delta in deltas.items() if delta
+        }
+    )
+
+
+def change_rating(title_id, added=None, removed=None):
+    """Атомарно учитывает оценку added и снимает оценку removed.
+
+    Сдвигает сумму, количество и гистограмму оценок произведения
+    и обновляет updated_at: по нему проверяется актуальность
+    и самого произведения, и списка его отзывов.
+    """
+    deltas = Counter()
+    if added is not None:
+        deltas[added] += 1
+    if removed is not None:
+        deltas[removed] -= 1
+    batch = getattr(_batch, 'titles', None)
+    if batch is None:
+        apply_rating_deltas(title_id, deltas)
+    else:
+        batch[title_id].update(deltas)
+
+
+def apply_user_deltas(user_id, deltas):
+    """Одним UPDATE сдвигает счётчики активности пользователя."""
+    get_user_model().objects.filter(pk=user_id).update(**{
+        field: F(field) + delta for field, delta in deltas.items() if delta
+    })
+
+
+def change_user_stats(user_id, **deltas):
+    """Сдвигает review_count, comment_count и score_sum пользователя."""
+    batch = getattr(_batch, 'users', None)
+    if batch is None:
+        apply_user_deltas(user_id, deltas)
+    else:
+        batch[user_id].update(deltas)
+
+
+def touch_titles(review_ids):
+    """Отмечает изменёнными произведения отзывов.
+
+    Список отзывов выводит число комментариев, а его актуальность
+    проверяется по updated_at произведения.
+    """
+    Title.objects.filter(pk__in=Review.objects.filter(
+        pk__in=review_ids).values('title_id')).update(
+        updated_at=timezone.now())
+
+
+def apply_comment_delta(review_ids, delta):
+    """Одним UPDATE сдвигает comments_count отзывов на delta.
+
+    Дата последнего комментария пересчитывается подзапросом по индексу
+    (review, pub_date, id); при delta == 0 отзывы только отмечаются
+    изменёнными.
+    """
+    fields = {'updated_at': timezone.now()}
+    if delta:
+        fields['comments_count'] = F('comments_count') + delta
+        fields['last_comment_at'] = Subquery(Comment.objects.filter(
+            review=OuterRef('pk')).order_by('-pub_date').values(
+            'pub_date')[:1])
+        touch_titles(review_ids)
+    Review.objects.filter(pk__in=review_ids).update(**fields)
+
+
+def change_facets(deltas):
+    """Сдвигает счётчики фасетов сразу или в конце batched_updates()."""
+    batch = getattr(_batch, 'facets', None)
+    if batch is not None:
+        batch.update(deltas)
+    else:
+        apply_facet_deltas(deltas)
+
+
+def on_commit_once(func):
+    """Вызывает func после коммита; внутри batched_updates() — один раз."""
+    batch = getattr(_batch, 'on_commit', None)
+    if batch is None:
+        transaction.on_commit(func)
+    elif func not in batch:
+        batch.append(func)
+
+
+@contextmanager
+def batched_updates():
+    """Копит изменения рейтингов и счётчиков авторов и отзывов.
+
+    На выходе применяет их одним UPDATE на произведение, одним
+    на автора и одним на отзывы с одинаковым изменением числа
+    комментариев, а отложенные до коммита вызовы ставит по одному
+    разу. Нужен при массовом удалении.
+    """
+    _batch.titles, _batch.users = defaultdict(Counter), defaultdict(Counter)
+    _batch.reviews, _batch.facets = Counter(), Counter()
+    _batch.on_commit = []
+    try:
+        yield
+        for title_id, deltas in _batch.titles.items():
+            apply_rating_deltas(title_id, deltas)
+        for user_id, deltas in _batch.users.items():
+            apply_user_deltas(user_id, deltas)
+        reviews_by_delta = defaultdict(list)
+        for review_id, delta in _batch.reviews.items():
+            reviews_by_delta[delta].append(review_id)
+        for delta, review_ids in reviews_by_delta.items():
+            apply_comment_delta(review_ids, delta)
+        apply_facet_deltas(_batch.facets)
+        for func in _batch.on_commit:
+            transaction.on_commit(func)
+    finally:
+        del _batch.titles, _batch.users, _batch.reviews, _batch.facets
+        del _batch.on_commit
+
+
+@receiver(post_init, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    instance._initial_score = instance.__dict__.get('score')
+    instance._initial_title_id = instance.__dict__.get('title_id')
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        # loaddata сохраняет рейтинг вместе с произведением.
+        return
+    if created:
+        change_rating(instance.title_id, added=instance.score)
+        change_user_stats(
+            instance.author_id, review_count=1, score_sum=instance.score)
+    elif instance._initial_title_id != instance.title_id:
+        change_rating(
+            instance._initial_title_id, removed=instance._initial_score)
+        change_rating(instance.title_id, added=instance.score)
+    else:
+        change_rating(
+            instance.title_id,
+            added=instance.score, removed=instance._initial_score)
+    if not created and instance.score != instance._initial_score:
+        change_user_stats(
+            instance.author_id,
+            score_sum=instance.score - instance._initial_score)
+    remember_review_score(sender, instance)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    change_rating(
+        instance._initial_title_id, removed=instance._initial_score)
+    change_user_stats(
+        instance.author_id,
+        review_count=-1, score_sum=-instance._initial_score)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_review(sender, instance, raw=False, created=None, **kwargs):
+    """Обновляет счётчик комментариев отзыва и отмечает его изменение."""
+    if raw:
+        return
+    # post_delete не передаёт created.
+    delta = -1 if created is None else int(created)
+    if delta:
+        change_user_stats(instance.author_id, comment_count=delta)
+    batch = getattr(_batch, 'reviews', None)
+    if batch is not None:
+        batch[instance.review_id] += delta
+    elif delta > 0:
+        # Новый комментарий почти всегда последний, подзапрос не нужен.
+        pub_date = Value(instance.pub_date, output_field=DateTimeField())
+        Review.objects.filter(pk=instance.review_id).update(
+            comments_count=F('comments_count') + 1,
+            last_comment_at=Greatest(
+                Coalesce('last_comment_at', pub_date), pub_date),
+            updated_at=timezone.now())
+        touch_titles([instance.review_id])
+    else:
+        apply_comment_delta([instance.review_id], delta)
+
+
+@receiver(post_save, sender=Title)
+def update_search_index(sender, instance, raw, **kwargs):
+    index_title(instance)
+
+
+@receiver(post_delete, sender=Title)
+def delete_from_search_index(sender, instance, **kwargs):
+    unindex_title(instance)
+
+
+@receiver(titles_bulk_created, sender=Title)
+def update_search_index_bulk(sender, titles, **kwargs):
+    index_titles(titles, replace=False)
+
+
+# Поля произведения, от которых зависят фасеты.
+TITLE_FACETS = {'year': FacetCount.YEAR, 'category_id': FacetCount.CATEGORY}
+CATALOG_FACETS = {Category: FacetCount.CATEGORY, Genre: FacetCount.GENRE}
+
+
+def title_facets(values, sign=1):
+    """Изменения фасетов от добавления (sign=1) или удаления произведения."""
+    return Counter({
+        (TITLE_FACETS[field],
+         decade(value) if field == 'year' else value): sign
+        for field, value in values.items() if value is not None
+    })
+
+
+@receiver(post_init, sender=Title)
+def remember_title_facets(sender, instance, **kwargs):
+    # Отложенные через only() поля не сравниваются.
+    instance._initial_facets = {
+        field: instance.__dict__[field]
+        for field in TITLE_FACETS if field in instance.__dict__
+    }
+
+
+@receiver(post_save, sender=Title)
+def update_facets_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        # После loaddata фасеты пересчитывает refresh_facets.
+        return
+    current = {field: getattr(instance, field)
+               for field in (TITLE_FACETS if created
+                             else instance._initial_facets)}
+    deltas = title_facets(current)
+    if not created:
+        deltas.subtract(title_facets(instance._initial_facets))
+    change_facets(deltas)
+    instance._initial_facets = current
+
+
+@receiver(post_delete, sender=Title)
+def update_facets_on_delete(sender, instance, **kwargs):
+    # Связи с жанрами удаляются каскадом и вычитаются по одной.
+    change_facets(title_facets(instance._initial_facets, sign=-1))
+
+
+@receiver(titles_bulk_created, sender=Title)
+def update_facets_bulk(sender, titles, **kwargs):
+    deltas = Counter()
+    for title in titles:
+        deltas.update(title_facets(
+            {field: getattr(title, field) for field in TITLE_FACETS}))
+    deltas.update({
+        (FacetCount.GENRE, genre_id): count
+        for genre_id, count in GenreTitle.objects.filter(
+            title__in=titles, genre__isnull=False).values_list(
+            'genre').annotate(count=Count('id')).order_by()
+    })
+    change_facets(deltas)
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def update_genre_facet(sender, instance, raw=False, created=None, **kwargs):
+    # add() создаёт связи без post_save (они считаются по m2m_changed),
+    # а remove() и clear() удаляют их через delete() с post_delete.
+    if raw or created is False or instance.genre_id is None:
+        return
+    change_facets({
+        (FacetCount.GENRE, instance.genre_id): 1 if created else -1})
+
+
+@receiver(m2m_changed, sender=GenreTitle)
+def update_genre_facet_on_add(sender, instance, action, reverse, pk_set,
+                              **kwargs):
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        change_facets({(FacetCount.GENRE, instance.pk): len(pk_set)})
+    else:
+        change_facets(Counter(
+            (FacetCount.GENRE, genre_id) for genre_id in pk_set))
+
+
+@receiver(post_init, sender=Category)
+@receiver(post_init, sender=Genre)
+def remember_slug(sender, instance, **kwargs):
+    instance._initial_slug = (
+        instance.__dict__.get('slug'), instance.__dict__.get('name'))
+
+
+def touch_catalog_titles(sender, instance):
+    """Отмечает изменёнными произведения категории или жанра.
+
+    Произведение выводит их название и slug, а его актуальность
+    проверяется по updated_at.
+    """
+    Title.objects.filter(**{CATALOG_FACETS[sender]: instance}).update(
+        updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def rename_catalog_entry(sender, instance, created, **kwargs):
+    slug, name = instance._initial_slug
+    if not created and (slug, name) != (instance.slug, instance.name):
+        FacetCount.objects.filter(
+            facet=CATALOG_FACETS[sender], value=slug).update(
+            value=instance.slug, name=instance.name)
+        touch_catalog_titles(sender, instance)
+    remember_slug(sender, instance)
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+def touch_titles_on_delete(sender, instance, **kwargs):
+    # После удаления связи уже обнулены через SET_NULL.
+    touch_catalog_titles(sender, instance)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def delete_facet(sender, instance, **kwargs):
+    # Связи произведений обнуляются через SET_NULL без сигналов.
+    FacetCount.objects.filter(
+        facet=CATALOG_FACETS[sender], value=instance.slug).delete()
+
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_username(sender, instance, **kwargs):
+    instance._initial_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def touch_authored(sender, instance, created, **kwargs):
+    """Отмечает изменёнными отзывы и комментарии, где выводится имя автора.
+
+    Список отзывов проверяется по updated_at произведения, список
+    комментариев — по updated_at отзыва.
+    """
+    if not created and instance._initial_username not in (
+            None, instance.username):
+        now = timezone.now()
+        Comment.objects.filter(author=instance).update(updated_at=now)
+        Review.objects.filter(
+            Q(author=instance) | Q(comments__author=instance)).update(
+            updated_at=now)
+        Title.objects.filter(reviews__author=instance).update(updated_at=now)
+    remember_username(sender, instance)
@@ -1,13 +1,25 @@
 from django.contrib import admin
+from reviews.paginators import EstimatedCountPaginator
 
-from .models import CustomUser
+from .models import CustomUser, OutboxEmail
 
 
 class UserAdmin(admin.ModelAdmin):  # type: ignore
     list_display = ('pk', 'username', 'email', 'role')
-    search_fields = ('email',)
+    search_fields = ('email', 'username')
     ordering = ('email',)
     list_editable = ('role',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class OutboxEmailAdmin(admin.ModelAdmin):  # type: ignore
+    list_display = ('recipient', 'subject', 'created', 'attempts', 'sent_at')
+    search_fields = ('recipient',)
+    list_filter = ('sent_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 admin.site.register(CustomUser, UserAdmin)
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
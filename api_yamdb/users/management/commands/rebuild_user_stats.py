@@ -0,0 +1,33 @@
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Sum
+from reviews.management.rebuild import RebuildCountersCommand, grouped
+from reviews.models import Comment, Review
+
+User = get_user_model()
+
+
+class Command(RebuildCountersCommand):
+    help = ('Пересчитывает счётчики отзывов, комментариев и оценок '
+            'пользователей и сообщает о расхождениях.')
+    model = User
+    counters = User.ACTIVITY_COUNTERS
+
+    def get_actual(self):
+        actual = defaultdict(dict)
+        for row in grouped(Review.objects, 'author',
+                           count=Count('id'), total=Sum('score')):
+            actual[row['author']]['review_count'] = row['count']
+            actual[row['author']]['score_sum'] = row['total']
+        for row in grouped(Comment.objects, 'author', count=Count('id')):
+            actual[row['author']]['comment_count'] = row['count']
+        return actual
+
+    def describe(self, user, expected):
+        return (
+            f'Пользователь {user.id}: хранится '
+            f'{user.review_count}/{user.comment_count}/{user.score_sum}, '
+            f'по записям {expected["review_count"]}/'
+            f'{expected["comment_count"]}/{expected["score_sum"]}'
+        )
@@ -0,0 +1,112 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from users.models import OutboxEmail
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди OutboxEmail пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Сколько писем отправлять за одно SMTP-соединение.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Разобрать очередь один раз и завершиться.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent = self.send_batch(options['batch_size'])
+            if sent:
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
+
+    def send_batch(self, batch_size):
+        """Отправляет одну пачку писем, возвращает число обработанных.
+
+        0 — очередь пуста или почтовый сервер недоступен.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(
+                OutboxEmail.objects.select_for_update(skip_locked=True)
+                .filter(
+                    sent_at__isnull=True,
+                    next_attempt_at__lte=now,
+                    attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+                )[:batch_size]
+            )
+            if not emails:
+                return 0
+            connection = get_connection()
+            try:
+                connection.open()
+            except Exception as error:
+                # Сервер недоступен: вся пачка ждёт следующей попытки,
+                # а обработчик — интервала опроса.
+                self.stderr.write(f'Почтовый сервер недоступен: {error}')
+                for email in emails:
+                    email.attempts += 1
+                    self.retry_later(email, now, error)
+                self.save(emails)
+                return 0
+            try:
+                for email in emails:
+                    self.send_one(connection, email, now)
+            finally:
+                connection.close()
+            self.save(emails)
+        return len(emails)
+
+    def save(self, emails):
+        OutboxEmail.objects.bulk_update(
+            emails,
+            ('sent_at', 'attempts', 'next_attempt_at', 'last_error'),
+        )
+
+    def retry_later(self, email, now, error):
+        """Откладывает письмо с паузой, растущей вдвое с каждой попыткой."""
+        email.last_error = str(error)
+        email.next_attempt_at = now + timedelta(
+            seconds=settings.EMAIL_OUTBOX_RETRY_DELAY
+            * 2 ** (email.attempts - 1)
+        )
+
+    def send_one(self, connection, email, now):
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.body,
+            from_email=settings.CONTACT_EMAIL,
+            to=[email.recipient],
+            connection=connection,
+        )
+        email.attempts += 1
+        try:
+            connection.send_messages([message])
+        except Exception as error:
+            self.retry_later(email, now, error)
+            self.stderr.write(f'{email}: {error}')
+            # Следующее письмо пачки откроет соединение заново.
+            connection.close()
+            return
+        email.sent_at = now
+        email.last_error = ''
@@ -2,6 +2,7 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from reviews import validators
 
 ROLE_CHOICES = (
@@ -11,7 +12,20 @@ ROLE_CHOICES = (
 )
 
 
-class CustomUser(AbstractUser):  # type: ignore
+class UserRoleMixin:
+    """Проверки ролей по полям role, is_staff и is_superuser."""
+
+    @property
+    def is_admin(self):
+        return (self.role == settings.ADMIN
+                or self.is_superuser or self.is_staff)
+
+    @property
+    def is_moderator(self):
+        return self.role == settings.MODERATOR
+
+
+class CustomUser(UserRoleMixin, AbstractUser):  # type: ignore
     """Кастомная модель User.
        Позволяет при создании запрашивать емейл и юзернейм.
     """
@@ -52,6 +66,15 @@ class CustomUser(AbstractUser):  # type: ignore
         verbose_name='Код подтверждения',
         default=' '
     )
+    # Счётчики ведут сигналы reviews; сверяет rebuild_user_stats.
+    review_count: int = models.PositiveIntegerField(
+        'Отзывов', default=0, editable=False)
+    comment_count: int = models.PositiveIntegerField(
+        'Комментариев', default=0, editable=False)
+    score_sum: int = models.PositiveIntegerField(
+        'Сумма поставленных оценок', default=0, editable=False)
+
+    ACTIVITY_COUNTERS = ('review_count', 'comment_count', 'score_sum')
 
     class Meta:
         ordering = ('id',)
@@ -66,11 +89,56 @@ class CustomUser(AbstractUser):  # type: ignore
         """Строковое представление модели (отображается в консоли)."""
         return self.username
 
-    @property
-    def is_admin(self):
-        return (self.role == settings.ADMIN
-                or self.is_superuser or self.is_staff)
+    def save(self, *args, **kwargs) -> None:
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Иначе сохранение профиля затрёт счётчики, которые
+            # параллельно сдвинули отзывы и комментарии.
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.ACTIVITY_COUNTERS
+            ]
+        super().save(*args, **kwargs)
 
     @property
-    def is_moderator(self):
-        return self.role == settings.MODERATOR
+    def average_score(self):
+        """Средняя оценка в отзывах пользователя."""
+        if not self.review_count:
+            return None
+        return round(self.score_sum / self.review_count, 2)
+
+
+class OutboxEmail(models.Model):
+    """Письмо, ожидающее отправки фоновым обработчиком."""
+    recipient: str = models.EmailField(
+        'Получатель',
+        max_length=settings.EMAIL_LENGTH,
+    )
+    subject: str = models.CharField('Тема', max_length=255)
+    body: str = models.TextField('Текст')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now,
+    )
+    attempts: int = models.PositiveSmallIntegerField(
+        'Попыток отправки',
+        default=0,
+    )
+    last_error: str = models.TextField('Последняя ошибка', blank=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('next_attempt_at',)
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(sent_at__isnull=True),
+                name='outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.recipient}: {self.subject}'
@@ -0,0 +1,80 @@
+"""Цена соединения с базой в расчёте на один запрос.
+
+Повторяет цикл обработки запроса Django (request_started, запрос
+к базе, request_finished) с CONN_MAX_AGE=0 и с постоянным соединением.
+Запуск из корня репозитория:
+    python -m benchmarks.connections --requests 500
+    BENCHMARK_DB=postgres DB_HOST=127.0.0.1 python -m benchmarks.connections
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks.run import ROOT_DIR, percentile
+
+MODES = (('none', 0), ('persistent', 60))
+
+
+def measure(max_age, requests):
+    from django.core.signals import request_finished, request_started
+    from django.db import connection
+    from django.db.backends.signals import connection_created
+
+    opened = []
+
+    def count_connection(**kwargs):
+        opened.append(1)
+
+    connection.close()
+    connection.settings_dict['CONN_MAX_AGE'] = max_age
+    connection_created.connect(count_connection)
+    latencies = []
+    try:
+        for _ in range(requests):
+            started = time.perf_counter()
+            request_started.send(sender=None)
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            request_finished.send(sender=None)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        connection_created.disconnect(count_connection)
+        connection.close()
+    return {
+        'conn_max_age': max_age,
+        'requests': requests,
+        'connections': len(opened),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'total_ms': round(sum(latencies) * 1000, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.path.join(ROOT_DIR, 'api_yamdb'))
+    sys.path.insert(0, ROOT_DIR)
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    import django
+    django.setup()
+    from django.conf import settings
+
+    result = {
+        'database': settings.DATABASES['default']['ENGINE'],
+        'health_checks': settings.DB_CONN_HEALTH_CHECKS,
+        'modes': {
+            mode: measure(max_age, args.requests)
+            for mode, max_age in MODES
+        },
+    }
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
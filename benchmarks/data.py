@@ -0,0 +1,73 @@
+import io
+import random
+
+from django.conf import settings
+from django.core.management import call_command
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.search import rebuild_search_index
+from users.models import CustomUser as User
+
+BATCH_SIZE = 500
+
+
+def generate(users, titles, reviews_per_title, comments_per_review,
+             genres=20, categories=5, seed=0):
+    """Заполняет базу синтетическими данными через модели проекта.
+
+    Возвращает администратора и обычного пользователя для запросов.
+    """
+    rng = random.Random(seed)
+    User.objects.bulk_create(
+        User(username=f'user{number}', email=f'user{number}@example.com',
+             role=settings.USER)
+        for number in range(users)
+    )
+    admin = User.objects.create(
+        username='bench_admin', email='bench_admin@example.com',
+        role=settings.ADMIN)
+    Category.objects.bulk_create(
+        Category(name=f'Категория {number}', slug=f'category-{number}')
+        for number in range(categories)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+        for number in range(genres)
+    )
+    category_ids = list(Category.objects.values_list('id', flat=True))
+    genre_ids = list(Genre.objects.values_list('id', flat=True))
+    user_ids = list(User.objects.values_list('id', flat=True))
+    Title.objects.bulk_create(
+        (Title(name=f'Произведение {number}', year=rng.randint(1900, 2020),
+               description='Описание', category_id=rng.choice(category_ids))
+         for number in range(titles)),
+        batch_size=BATCH_SIZE,
+    )
+    title_ids = list(Title.objects.values_list('id', flat=True))
+    GenreTitle.objects.bulk_create(
+        (GenreTitle(title_id=title_id, genre_id=genre_id)
+         for title_id in title_ids
+         for genre_id in rng.sample(genre_ids, min(2, len(genre_ids)))),
+        batch_size=BATCH_SIZE,
+    )
+    Review.objects.bulk_create(
+        (Review(title_id=title_id, author_id=author_id, text='Отзыв',
+                score=rng.randint(settings.MIN_SCORE, settings.MAX_SCORE))
+         for title_id in title_ids
+         for author_id in rng.sample(
+             user_ids, min(reviews_per_title, len(user_ids)))),
+        batch_size=BATCH_SIZE,
+    )
+    Comment.objects.bulk_create(
+        (Comment(review_id=review_id, author_id=rng.choice(user_ids),
+                 text='Комментарий')
+         for review_id in Review.objects.values_list('id', flat=True)
+         for _ in range(comments_per_review)),
+        batch_size=BATCH_SIZE,
+    )
+    call_command('rebuild_ratings', stdout=io.StringIO())
+    call_command('rebuild_user_stats', stdout=io.StringIO())
+    call_command('rebuild_comment_counts', stdout=io.StringIO())
+    call_command('refresh_facets', stdout=io.StringIO())
+    call_command('refresh_leaderboards', stdout=io.StringIO())
+    rebuild_search_index()
+    return admin, User.objects.get(username='user0')
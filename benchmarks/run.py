@@ -0,0 +1,268 @@
+"""Бенчмарк API на синтетических данных.
+
+Запуск из корня репозитория:
+    python -m benchmarks.run --titles 500 --iterations 50 -o result.json
+    python -m benchmarks.run --compare result.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from itertools import count
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, number):
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100)[number - 1]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def get_routes(admin, user):
+    """Маршруты api/urls.py: имя, метод, адрес, клиент и подготовка.
+
+    Удаление одного объекта нельзя повторить по тому же адресу, поэтому
+    удаление меряется через маршруты модерации: подготовка создаёт
+    новый объект перед каждым запросом.
+    """
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from reviews.models import Comment, Review, Title
+    from users.models import CustomUser as User
+
+    title = Title.objects.order_by('id').first()
+    review = Review.objects.filter(title=title).order_by('id').first()
+    comment = Comment.objects.filter(review=review).order_by('id').first()
+    titles_url = f'/api/v1/titles/{title.id}'
+    reviews_url = f'{titles_url}/reviews'
+    comments_url = f'{reviews_url}/{review.id}/comments'
+    numbers = count()
+
+    def signup_data():
+        number = next(numbers)
+        return {'username': f'new{number}', 'email': f'new{number}@ex.com'}
+
+    def token_data():
+        User.objects.filter(pk=user.pk).update(confirmation_code='12345')
+        return {'username': user.username, 'confirmation_code': '12345'}
+
+    def title_data():
+        return {'name': f'Новое произведение {next(numbers)}', 'year': 2000,
+                'category': 'category-1', 'genre': ['genre-1', 'genre-2']}
+
+    def review_data():
+        # Второй отзыв автора на произведение запрещён.
+        Review.objects.filter(title=title, author=user).delete()
+        return {'text': 'Отзыв из бенчмарка', 'score': 7}
+
+    def review_ids():
+        new_title = Title.objects.create(name='На модерацию', year=2000)
+        return {'ids': [Review.objects.create(
+            title=new_title, author=user, text='Отзыв', score=5).id]}
+
+    def comment_ids():
+        return {'ids': [Comment.objects.create(
+            review=review, author=user, text='Комментарий').id]}
+
+    def import_data():
+        lines = ''.join(
+            f'{{"name": "Импорт {next(numbers)}", "year": 2000, '
+            f'"category": "category-1", "genre": ["genre-1"]}}\n'
+            for _ in range(10))
+        return {'file': SimpleUploadedFile(
+            'titles.jsonl', lines.encode())}
+
+    return [
+        ('signup', 'post', '/api/v1/auth/signup/', None, signup_data),
+        ('token', 'post', '/api/v1/auth/token/', None, token_data),
+        ('users-list', 'get', '/api/v1/users/', admin, None),
+        ('users-detail', 'get', f'/api/v1/users/{user.username}/',
+         admin, None),
+        ('users-me', 'get', '/api/v1/users/me/', user, None),
+        ('users-me-update', 'patch', '/api/v1/users/me/', user,
+         lambda: {'bio': 'Обновлено бенчмарком'}),
+        ('users-activity', 'get', f'/api/v1/users/{user.username}/activity/',
+         None, None),
+        ('categories-list', 'get', '/api/v1/categories/', None, None),
+        ('genres-list', 'get', '/api/v1/genres/', None, None),
+        ('titles-list', 'get', '/api/v1/titles/', None, None),
+        ('titles-list-filtered', 'get',
+         '/api/v1/titles/?genre=genre-1&year=2000', None, None),
+        ('titles-list-search', 'get', '/api/v1/titles/?search=1',
+         None, None),
+        ('titles-list-facets', 'get', '/api/v1/titles/?facets=1',
+         None, None),
+        ('titles-facets', 'get', '/api/v1/titles/facets/?genre=genre-1',
+         None, None),
+        ('titles-detail', 'get', f'{titles_url}/', None, None),
+        ('titles-rating', 'get', f'{titles_url}/rating/', None, None),
+        ('titles-create', 'post', '/api/v1/titles/', admin, title_data),
+        ('titles-update', 'patch', f'{titles_url}/', admin,
+         lambda: {'description': 'Обновлено бенчмарком'}),
+        ('titles-import', 'post', '/api/v1/titles/import/', admin,
+         import_data),
+        ('leaderboards-top', 'get', '/api/v1/leaderboards/top/',
+         None, None),
+        ('leaderboards-trending-genre', 'get',
+         '/api/v1/leaderboards/trending/?genre=genre-1', None, None),
+        ('reviews-list', 'get', f'{reviews_url}/', None, None),
+        ('reviews-list-cursor', 'get', f'{reviews_url}/?pagination=cursor',
+         None, None),
+        ('reviews-list-ordered', 'get',
+         f'{reviews_url}/?ordering=-comments_count', None, None),
+        ('reviews-detail', 'get', f'{reviews_url}/{review.id}/', None, None),
+        ('reviews-create', 'post', f'{reviews_url}/', user, review_data),
+        ('reviews-update', 'patch', f'{reviews_url}/{review.id}/', admin,
+         lambda: {'text': 'Обновлено бенчмарком'}),
+        ('comments-list', 'get', f'{comments_url}/', None, None),
+        ('comments-detail', 'get', f'{comments_url}/{comment.id}/',
+         None, None),
+        ('comments-create', 'post', f'{comments_url}/', user,
+         lambda: {'text': 'Комментарий из бенчмарка'}),
+        ('comments-update', 'patch', f'{comments_url}/{comment.id}/', admin,
+         lambda: {'text': 'Обновлено бенчмарком'}),
+        ('moderation-reviews', 'post', '/api/v1/moderation/reviews/', admin,
+         review_ids),
+        ('moderation-comments', 'post', '/api/v1/moderation/comments/',
+         admin, comment_ids),
+        ('metrics', 'get', '/api/v1/metrics/', admin, None),
+    ]
+
+
+def measure(route, iterations):
+    from api.authentication import get_access_token
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    name, method, url, user, make_data = route
+    client = APIClient()
+    if user is not None:
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {get_access_token(user)}')
+    latencies, queries, statuses = [], [], set()
+    for _ in range(iterations):
+        data = make_data() if make_data else None
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data)
+            latencies.append(time.perf_counter() - started)
+        queries.append(counter.count)
+        statuses.add(response.status_code)
+    return {
+        'requests': iterations,
+        'statuses': sorted(statuses),
+        'rps': round(iterations / sum(latencies), 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'queries': max(queries),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, previous):
+    """Строки сравнения p50 и числа запросов с предыдущим прогоном."""
+    lines = []
+    for name, result in current['routes'].items():
+        before = previous['routes'].get(name)
+        if before is None:
+            continue
+        ratio = result['p50_ms'] / before['p50_ms'] if before['p50_ms'] else 0
+        lines.append(
+            f'{name:24} p50 {before["p50_ms"]:8.2f} -> '
+            f'{result["p50_ms"]:8.2f} мс ({ratio:5.2f}x), '
+            f'запросов {before["queries"]} -> {result["queries"]}'
+        )
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--titles', type=int, default=500)
+    parser.add_argument('--reviews-per-title', type=int, default=10)
+    parser.add_argument('--comments-per-review', type=int, default=2)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--routes', nargs='*',
+                        help='Запустить только указанные маршруты.')
+    parser.add_argument('-o', '--output', help='Куда записать JSON.')
+    parser.add_argument('--compare', help='JSON предыдущего прогона.')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.path.join(ROOT_DIR, 'api_yamdb'))
+    sys.path.insert(0, ROOT_DIR)
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.test.utils import setup_test_environment
+
+    from benchmarks.data import generate
+
+    if os.path.exists(settings.DATABASES['default']['NAME']):
+        os.remove(settings.DATABASES['default']['NAME'])
+    setup_test_environment()
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    scale = {
+        'users': args.users,
+        'titles': args.titles,
+        'reviews_per_title': args.reviews_per_title,
+        'comments_per_review': args.comments_per_review,
+    }
+    started = time.perf_counter()
+    admin, user = generate(**scale)
+    generation_seconds = round(time.perf_counter() - started, 2)
+    result = {
+        'meta': {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': settings.DATABASES['default']['ENGINE'],
+            'scale': scale,
+            'iterations': args.iterations,
+            'generation_seconds': generation_seconds,
+        },
+        'routes': {},
+    }
+    for route in get_routes(admin, user):
+        if args.routes and route[0] not in args.routes:
+            continue
+        result['routes'][route[0]] = measure(route, args.iterations)
+        print(route[0], json.dumps(result['routes'][route[0]]),
+              file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            json.dump(result, stream, indent=2, ensure_ascii=False)
+    else:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as stream:
+            print('\n'.join(compare(result, json.load(stream))),
+                  file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import os
+import tempfile
+
+from api_yamdb.settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(tempfile.gettempdir(), 'yamdb_benchmark.sqlite3'),
+    }
+}
+# BENCHMARK_DB=postgres берёт параметры DB_* из окружения, как в продакшене.
+if os.getenv('BENCHMARK_DB') == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', default='postgres'),
+            'USER': os.getenv('POSTGRES_USER', default='postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
+            'HOST': os.getenv('DB_HOST', default='localhost'),
+            'PORT': os.getenv('DB_PORT', default='5432'),
+        }
+    }
+# Бенчмарк меряет одну базу, реплики из окружения не подключаются.
+DATABASE_REPLICAS = []
+# В репозитории нет файлов миграций: схема создаётся через run_syncdb.
+MIGRATION_MODULES = {'users': None, 'reviews': None, 'api': None}
+
+# По умолчанию меряем путь до базы; BENCHMARK_CACHE=1 включает кэш каталога.
+if os.getenv('BENCHMARK_CACHE') != '1':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }
+    }
+
+# Маршруты регистрации и записи вызываются сотни раз с одного адреса.
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,  # noqa: F405
+    'DEFAULT_THROTTLE_RATES': {'signup': None, 'token': None, 'writes': None},
+}
+SLOW_REQUEST_THRESHOLD = None
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
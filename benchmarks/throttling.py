@@ -0,0 +1,82 @@
+"""Время одной проверки ограничения частоты запросов.
+
+Сравнивает скользящее окно api.throttling с локальным хранилищем
+и с кэшем Django и SimpleRateThrottle из DRF на том же кэше.
+Запуск из корня репозитория:
+    python -m benchmarks.throttling --checks 100000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks.run import ROOT_DIR
+
+
+def measure(throttle_class, checks, clients):
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    factory = APIRequestFactory()
+    requests = [
+        Request(factory.post('/', REMOTE_ADDR=f'10.0.{number // 256}.'
+                                              f'{number % 256}'))
+        for number in range(clients)
+    ]
+    allowed = 0
+    started = time.perf_counter()
+    for number in range(checks):
+        allowed += throttle_class().allow_request(
+            requests[number % clients], None)
+    elapsed = time.perf_counter() - started
+    return {
+        'checks': checks,
+        'allowed': allowed,
+        'us_per_check': round(elapsed / checks * 1e6, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--checks', type=int, default=100000)
+    parser.add_argument('--clients', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.path.join(ROOT_DIR, 'api_yamdb'))
+    sys.path.insert(0, ROOT_DIR)
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    import django
+    django.setup()
+    from api import throttling
+    from django.conf import settings
+    from rest_framework.throttling import AnonRateThrottle
+
+    rate = '1000/min'
+
+    class Sliding(throttling.SignUpRateThrottle):
+        def get_rate(self):
+            return rate
+
+    class Simple(AnonRateThrottle):
+        def get_rate(self):
+            return rate
+
+    alias = settings.THROTTLE_CACHE_ALIAS
+    settings.CACHES[alias] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'throttling-benchmark',
+    }
+    result = {}
+    for name, store in (
+            ('sliding-local', throttling.LocalCounterStore(
+                settings.THROTTLE_LOCAL_MAX_KEYS)),
+            ('sliding-cache', throttling.CacheCounterStore(alias))):
+        throttling.store = store
+        result[name] = measure(Sliding, args.checks, args.clients)
+    result['drf-simple-cache'] = measure(Simple, args.checks, args.clients)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from api.activity import ActivityFeed, decode_cursor, encode_cursor
+from rest_framework.exceptions import NotFound
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class ListFeed(ActivityFeed):
+    """Лента по спискам вместо таблиц: (pub_date, вид, id)."""
+    page_size = 3
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def stream(self, kind, author_id, position):
+        rows = sorted(
+            (entry for entry in self.entries if entry[1] == kind
+             and (position is None or entry < position)),
+            reverse=True)
+        for entry in rows[:self.page_size + 1]:
+            yield entry, {'id': entry[2]}
+
+
+class TestActivityFeed:
+
+    def test_cursor_round_trip(self):
+        position = (NOW, 'comment', 42)
+        assert decode_cursor(encode_cursor(position)) == position, (
+            'Проверьте, что курсор хранит позицию записи без потерь'
+        )
+
+    @pytest.mark.parametrize('cursor', ['', 'zzz', encode_cursor(
+        (NOW, 'title', 1))])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(NotFound):
+            decode_cursor(cursor)
+
+    def test_pages_merge_without_gaps(self):
+        entries = [
+            (NOW, 'review', 1), (NOW, 'comment', 5), (NOW, 'comment', 2),
+            (NOW - timedelta(1), 'review', 3),
+            (NOW - timedelta(2), 'comment', 7),
+        ]
+        feed = ListFeed(entries)
+        seen, cursor = [], None
+        while True:
+            page, cursor = feed.get_page(1, cursor)
+            seen += [position for position, _ in page]
+            if cursor is None:
+                break
+        assert seen == sorted(entries, reverse=True), (
+            'Проверьте, что лента сливает отзывы и комментарии по дате '
+            'без пропусков и повторов на границах страниц'
+        )
@@ -0,0 +1,44 @@
+import pytest
+from django.db.models import QuerySet
+from reviews import paginators
+from reviews.models import Review
+from reviews.paginators import EstimatedCountPaginator
+
+
+@pytest.fixture
+def exact_count(monkeypatch):
+    monkeypatch.setattr(QuerySet, 'count', lambda self: 7)
+
+
+class TestEstimatedCountPaginator:
+
+    def test_large_table_uses_estimate(self, monkeypatch, settings,
+                                       exact_count):
+        settings.ADMIN_ESTIMATED_COUNT_THRESHOLD = 1000
+        monkeypatch.setattr(
+            paginators, 'estimated_count', lambda model, using: 5000)
+        paginator = EstimatedCountPaginator(Review.objects.all(), 100)
+        assert paginator.count == 5000, (
+            'Проверьте, что для большой таблицы без фильтров число строк '
+            'берётся из статистики'
+        )
+
+    @pytest.mark.parametrize('estimate', [None, 10])
+    def test_small_or_unknown_counts_exactly(self, monkeypatch, settings,
+                                             exact_count, estimate):
+        settings.ADMIN_ESTIMATED_COUNT_THRESHOLD = 1000
+        monkeypatch.setattr(
+            paginators, 'estimated_count', lambda model, using: estimate)
+        paginator = EstimatedCountPaginator(Review.objects.all(), 100)
+        assert paginator.count == 7, (
+            'Проверьте, что небольшие таблицы считаются точно'
+        )
+
+    def test_filtered_counts_exactly(self, monkeypatch, exact_count):
+        monkeypatch.setattr(
+            paginators, 'estimated_count', lambda model, using: 10 ** 9)
+        paginator = EstimatedCountPaginator(
+            Review.objects.filter(score=10), 100)
+        assert paginator.count == 7, (
+            'Проверьте, что отфильтрованный список считается точно'
+        )
@@ -0,0 +1,33 @@
+from api.authentication import RoleTokenUser, StatelessJWTAuthentication
+from django.conf import settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class TestStatelessAuthentication:
+
+    def make_token(self, **claims):
+        token = AccessToken()
+        token['user_id'] = 1
+        token['username'] = 'user'
+        token['is_staff'] = False
+        token['is_superuser'] = False
+        for claim, value in claims.items():
+            token[claim] = value
+        return token
+
+    def test_user_is_built_from_claims(self):
+        user = StatelessJWTAuthentication().get_user(
+            self.make_token(role=settings.MODERATOR))
+        assert isinstance(user, RoleTokenUser), (
+            'Проверьте, что пользователь собирается из claims токена'
+        )
+        assert user.id == 1
+        assert user.is_authenticated
+        assert user.is_moderator
+        assert not user.is_admin
+
+    def test_admin_claims(self):
+        assert RoleTokenUser(self.make_token(role=settings.ADMIN)).is_admin
+        assert RoleTokenUser(
+            self.make_token(role=settings.USER, is_staff=True)).is_admin
+        assert not RoleTokenUser(self.make_token(role=settings.USER)).is_admin
@@ -0,0 +1,32 @@
+from api.cache import get_cache, get_version, invalidate_catalog, make_key
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+class TestCatalogCache:
+
+    def make_request(self, url):
+        return Request(APIRequestFactory().get(url))
+
+    def test_key_ignores_param_order_and_empty_values(self):
+        first = make_key(
+            self.make_request('/api/v1/titles/?genre=rock&page=2&name='), 1)
+        second = make_key(
+            self.make_request('/api/v1/titles/?page=2&genre=rock'), 1)
+        assert first == second, (
+            'Проверьте, что ключ кэша не зависит от порядка параметров '
+            'и пустых значений'
+        )
+
+    def test_key_depends_on_filters(self):
+        first = make_key(self.make_request('/api/v1/titles/?genre=rock'), 1)
+        second = make_key(self.make_request('/api/v1/titles/?genre=pop'), 1)
+        assert first != second
+
+    def test_invalidation_changes_version(self):
+        cache = get_cache()
+        version = get_version(cache)
+        invalidate_catalog()
+        assert get_version(cache) != version, (
+            'Проверьте, что сброс кэша меняет версию каталога'
+        )
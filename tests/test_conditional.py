@@ -0,0 +1,139 @@
+from datetime import datetime, timezone
+
+import pytest
+from api.cache import invalidate_catalog
+from api.conditional import ConditionalGetMixin, make_etag
+from api.views import TitleViewSet
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import CustomUser as User
+
+UPDATED_AT = datetime(2022, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class View(ConditionalGetMixin):
+    calls = 0
+
+    def get_last_modified(self):
+        return UPDATED_AT
+
+    def handler(self, request):
+        self.calls += 1
+        return Response({'id': 1})
+
+
+class TestConditionalGet:
+
+    def make_request(self, url='/api/v1/titles/1/', **headers):
+        return Request(APIRequestFactory().get(url, **headers))
+
+    def test_etag_depends_on_path_and_time(self):
+        request = self.make_request()
+        assert make_etag(request, UPDATED_AT) == make_etag(
+            self.make_request(), UPDATED_AT)
+        assert make_etag(request, UPDATED_AT) != make_etag(
+            self.make_request('/api/v1/titles/2/'), UPDATED_AT)
+        assert make_etag(request, UPDATED_AT) != make_etag(
+            request, UPDATED_AT.replace(microsecond=1)), (
+            'Проверьте, что ETag меняется вместе с updated_at'
+        )
+
+    def test_not_modified_skips_handler(self):
+        view = View()
+        response = view.conditional_response(
+            view.handler, self.make_request())
+        assert response.status_code == 200
+        assert 'ETag' in response and 'Last-Modified' in response
+        response = view.conditional_response(
+            view.handler,
+            self.make_request(HTTP_IF_NONE_MATCH=response['ETag']))
+        assert response.status_code == 304
+        assert view.calls == 1, (
+            'Проверьте, что ответ 304 отдаётся без вызова обработчика'
+        )
+
+    @pytest.mark.parametrize('header', [
+        'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE'])
+    def test_not_modified_keeps_validators(self, header):
+        view = View()
+        full = view.conditional_response(view.handler, self.make_request())
+        value = full['ETag' if header == 'HTTP_IF_NONE_MATCH'
+                     else 'Last-Modified']
+        response = view.conditional_response(
+            view.handler, self.make_request(**{header: value}))
+        assert response.status_code == 304
+        assert (response.get('ETag'), response.get('Last-Modified')) == (
+            full['ETag'], full['Last-Modified']), (
+            'Проверьте, что ответ 304 содержит ETag и Last-Modified'
+        )
+
+
+@pytest.fixture
+def review():
+    # Сброс кэша каталога ждёт коммита, которого в тестах нет.
+    invalidate_catalog()
+    category = Category.objects.create(name='Книги', slug='books')
+    genre = Genre.objects.create(name='Сказка', slug='tale')
+    title = Title.objects.create(name='Дюна', year=1965, category=category)
+    title.genre.add(genre)
+    author = User.objects.create(username='author', email='a@yamdb.ru')
+    review = Review.objects.create(
+        title=title, author=author, text='Отзыв', score=9)
+    Comment.objects.create(review=review, author=author, text='Комментарий')
+    return review
+
+
+def assert_changed(url, change):
+    client = APIClient()
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    change()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        f'Проверьте, что после изменения {url} не отвечает 304'
+    )
+
+
+@pytest.mark.django_db
+class TestRelatedChanges:
+
+    def test_category_and_genre_rename(self, review):
+        url = f'/api/v1/titles/{review.title_id}/'
+        category, genre = Category.objects.get(), Genre.objects.get()
+
+        def rename(entry):
+            entry.name = 'Новое название'
+            entry.save()
+
+        assert_changed(url, lambda: rename(category))
+        assert_changed(url, lambda: rename(genre))
+        assert_changed(url, genre.delete)
+
+    def test_username_change(self, review):
+        author = User.objects.get()
+
+        def rename():
+            author.username = f'{author.username}x'
+            author.save()
+
+        base = f'/api/v1/titles/{review.title_id}/reviews/'
+        for url in (base, f'{base}{review.id}/',
+                    f'{base}{review.id}/comments/'):
+            assert_changed(url, rename)
+
+    def test_title_retrieve_checks_once(self, review, monkeypatch):
+        calls = []
+        get_last_modified = TitleViewSet.get_last_modified
+
+        def counted(view):
+            calls.append(view.action)
+            return get_last_modified(view)
+
+        monkeypatch.setattr(TitleViewSet, 'get_last_modified', counted)
+        response = APIClient().get(f'/api/v1/titles/{review.title_id}/')
+        assert response.status_code == 200
+        assert calls == ['retrieve'], (
+            'Проверьте, что актуальность произведения проверяется '
+            'один раз за запрос'
+        )
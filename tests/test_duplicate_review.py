@@ -0,0 +1,76 @@
+import pytest
+from django.conf import settings
+from rest_framework.test import APIClient
+from reviews.models import Comment, Review, Title
+from users.models import CustomUser as User
+
+
+def client_for(username):
+    user = User.objects.create(username=username, email=f'{username}@yamdb.ru')
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def titles():
+    return (Title.objects.create(name='Дюна', year=1965),
+            Title.objects.create(name='Солярис', year=1961))
+
+
+@pytest.mark.django_db
+class TestDuplicateReview:
+
+    def test_second_review_rejected(self, titles):
+        dune, solaris = titles
+        client = client_for('reader')
+        url = f'/api/v1/titles/{dune.id}/reviews/'
+        data = {'text': 'Отзыв', 'score': 8}
+        assert client.post(url, data).status_code == 201
+        response = client.post(url, {'text': 'Ещё отзыв', 'score': 2})
+        assert response.status_code == 400
+        assert response.data['non_field_errors'] == [
+            settings.DUPLICATE_REVIEW_MESSAGE], (
+            'Проверьте, что повторный отзыв автора отклоняется '
+            'с DUPLICATE_REVIEW_MESSAGE'
+        )
+        dune.refresh_from_db()
+        assert dune.rating_count == 1 and dune.rating_sum == 8, (
+            'Проверьте, что отклонённый отзыв не меняет рейтинг'
+        )
+        assert client.post(
+            f'/api/v1/titles/{solaris.id}/reviews/', data).status_code == 201
+        assert client_for('critic').post(url, data).status_code == 201
+        assert Review.objects.count() == 3
+
+    def test_parents_are_not_shared_between_requests(self, titles):
+        dune, solaris = titles
+        client = client_for('reader')
+        reviews = [
+            Review.objects.create(
+                title=title, author=User.objects.get(), text=title.name,
+                score=5)
+            for title in titles
+        ]
+        for review in reviews:
+            Comment.objects.create(
+                review=review, author=review.author, text=review.text)
+        for title, review in zip(titles, reviews):
+            response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+            assert [item['text'] for item in response.data['results']] == [
+                title.name], (
+                'Проверьте, что произведение ищется заново в каждом запросе'
+            )
+            response = client.get(
+                f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/')
+            assert [item['text'] for item in response.data['results']] == [
+                review.text]
+        response = client.get(
+            f'/api/v1/titles/{dune.id}/reviews/{reviews[1].id}/comments/')
+        assert response.status_code == 404, (
+            'Проверьте, что отзыв другого произведения не находится'
+        )
+        response = client.post(
+            f'/api/v1/titles/{solaris.id + 100}/reviews/',
+            {'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 404
@@ -0,0 +1,123 @@
+import pytest
+from rest_framework.test import APIClient
+from reviews.facets import (count_facet, count_facets, format_facets,
+                            refresh_facets, stored_facets)
+from reviews.importers import ImportResult, import_chunk
+from reviews.models import Category, FacetCount, Genre, GenreTitle, Title
+
+
+class TestFacets:
+
+    def test_format(self):
+        rows = [
+            (FacetCount.GENRE, 'rock', 'Рок', 3),
+            (FacetCount.YEAR, '2000', '', 1),
+            (FacetCount.GENRE, 'tale', 'Сказка', 7),
+            (FacetCount.YEAR, '1990', '', 5),
+        ]
+        assert format_facets(rows) == {
+            'category': [],
+            'genre': [
+                {'slug': 'tale', 'name': 'Сказка', 'count': 7},
+                {'slug': 'rock', 'name': 'Рок', 'count': 3},
+            ],
+            'year': [
+                {'from': 1990, 'to': 1999, 'count': 5},
+                {'from': 2000, 'to': 2009, 'count': 1},
+            ],
+        }, (
+            'Проверьте, что жанры и категории выводятся от частых к редким, '
+            'а десятилетия — по порядку'
+        )
+
+
+@pytest.fixture
+def catalog():
+    books = Category.objects.create(name='Книги', slug='books')
+    films = Category.objects.create(name='Фильмы', slug='films')
+    rock = Genre.objects.create(name='Рок', slug='rock')
+    tale = Genre.objects.create(name='Сказка', slug='tale')
+    titles = [
+        Title.objects.create(name='A', year=1991, category=books),
+        Title.objects.create(name='B', year=1999, category=films),
+        Title.objects.create(name='C', year=2005, category=books),
+        Title.objects.create(name='D', year=2005),
+    ]
+    titles[0].genre.add(rock, tale)
+    titles[1].genre.add(rock)
+    titles[2].genre.add(tale)
+    return books, films, rock, tale, titles
+
+
+def assert_stored_matches():
+    facets = [facet for facet, _ in FacetCount.FACETS]
+    assert sorted(stored_facets(*facets)) == sorted(
+        count_facets(Title.objects.all())), (
+        'Проверьте, что счётчики FacetCount совпадают с пересчётом каталога'
+    )
+
+
+@pytest.mark.django_db
+class TestFacetCounts:
+
+    def test_count_facet(self, catalog):
+        assert sorted(count_facet(FacetCount.GENRE, Title.objects.all())) == [
+            (FacetCount.GENRE, 'rock', 'Рок', 2),
+            (FacetCount.GENRE, 'tale', 'Сказка', 2),
+        ]
+        assert sorted(count_facet(FacetCount.YEAR, Title.objects.all())) == [
+            (FacetCount.YEAR, '1990', '', 2),
+            (FacetCount.YEAR, '2000', '', 2),
+        ], 'Проверьте, что годы считаются по десятилетиям'
+        assert count_facet(
+            FacetCount.CATEGORY, Title.objects.filter(year=1991)) == [
+            (FacetCount.CATEGORY, 'books', 'Книги', 1)]
+
+    def test_deltas_follow_catalog_changes(self, catalog):
+        books, films, rock, tale, titles = catalog
+        assert_stored_matches()
+        titles[3].genre.set([rock, tale])
+        titles[0].genre.remove(tale)
+        tale.titles.add(titles[1])
+        assert_stored_matches()
+        titles[1].year, titles[1].category = 2010, None
+        titles[1].save()
+        titles[2].description = 'Описание'
+        titles[2].save()
+        assert_stored_matches()
+        GenreTitle.objects.create(title=titles[2], genre=rock)
+        titles[3].genre.clear()
+        titles[0].delete()
+        assert_stored_matches()
+        books.slug, books.name = 'novels', 'Романы'
+        books.save()
+        rock.delete()
+        films.delete()
+        assert_stored_matches()
+        import_chunk([
+            (1, {'name': 'E', 'year': 1987, 'category': 'novels',
+                 'genre': ['tale']}),
+        ], ImportResult())
+        assert_stored_matches()
+
+    def test_refresh_facets(self, catalog):
+        FacetCount.objects.all().delete()
+        assert refresh_facets() == FacetCount.objects.count()
+        assert_stored_matches()
+
+    def test_get_facets_is_disjunctive(self, catalog):
+        response = APIClient().get(
+            '/api/v1/titles/facets/', {'genre': 'rock'})
+        assert response.status_code == 200
+        facets = response.data
+        assert facets['genre'] == [
+            {'slug': 'rock', 'name': 'Рок', 'count': 2},
+            {'slug': 'tale', 'name': 'Сказка', 'count': 2},
+        ], 'Проверьте, что фасет жанра считается без фильтра по жанру'
+        assert facets['category'] == [
+            {'slug': 'books', 'name': 'Книги', 'count': 1},
+            {'slug': 'films', 'name': 'Фильмы', 'count': 1},
+        ], 'Проверьте, что остальные фасеты учитывают фильтр по жанру'
+        assert facets['year'] == [
+            {'from': 1990, 'to': 1999, 'count': 2},
+        ]
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+
+from api.rows import CommentRows, ReviewRows, TitleRows
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleReadSerializer)
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import CustomUser as User
+
+PUB_DATE = datetime(2022, 3, 1, 9, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+def with_genres(title, genres):
+    """Произведение с жанрами, как после prefetch_related('genre')."""
+    queryset = Genre.objects.all()
+    queryset._result_cache = genres
+    queryset._prefetch_done = True
+    title._prefetched_objects_cache = {'genre': queryset}
+    return title
+
+
+class TestFastLists:
+
+    def test_titles_match_serializer(self):
+        genres = [Genre(id=2, name='Рок', slug='rock'),
+                  Genre(id=1, name='Сказка', slug='tale')]
+        titles = [
+            with_genres(Title(
+                id=1, name='Т ', year=2000, description='Описание',
+                category=Category(name='Книги', slug='books'),
+                rating_sum=17, rating_count=3), genres),
+            with_genres(Title(id=2, name='Без категории', year=1990), []),
+        ]
+        rows = [
+            {'id': 1, 'name': 'Т ', 'year': 2000, 'rating_sum': 17,
+             'rating_count': 3, 'description': 'Описание',
+             'category__name': 'Книги', 'category__slug': 'books'},
+            {'id': 2, 'name': 'Без категории', 'year': 1990,
+             'rating_sum': 0, 'rating_count': 0, 'description': None,
+             'category__name': None, 'category__slug': None},
+        ]
+        genre_data = [{'name': genre.name, 'slug': genre.slug}
+                      for genre in genres]
+        fast = [TitleRows().to_dict(rows[0], genre_data),
+                TitleRows().to_dict(rows[1], [])]
+        assert render(fast) == render(
+            TitleReadSerializer(titles, many=True).data), (
+            'Проверьте, что быстрый вывод произведений совпадает '
+            'с TitleReadSerializer'
+        )
+
+    def test_reviews_and_comments_match_serializers(self):
+        author = User(username='автор')
+        review = Review(id=5, author=author, score=7, text='Отзыв',
+                        pub_date=PUB_DATE, title_id=3, comments_count=2,
+                        last_comment_at=PUB_DATE)
+        comment = Comment(id=8, author=author, text='Комментарий',
+                          pub_date=PUB_DATE, review_id=5)
+        review_row = {'id': 5, 'author__username': 'автор', 'score': 7,
+                      'text': 'Отзыв', 'pub_date': PUB_DATE,
+                      'comments_count': 2, 'last_comment_at': PUB_DATE,
+                      'title': 3}
+        comment_row = {'id': 8, 'author__username': 'автор',
+                       'text': 'Комментарий', 'pub_date': PUB_DATE,
+                       'review': 5}
+        assert render(ReviewRows().serialize([review_row])) == render(
+            ReviewSerializer([review], many=True).data), (
+            'Проверьте, что быстрый вывод отзывов совпадает '
+            'с ReviewSerializer'
+        )
+        assert render(CommentRows().serialize([comment_row])) == render(
+            CommentSerializer([comment], many=True).data), (
+            'Проверьте, что быстрый вывод комментариев совпадает '
+            'с CommentSerializer'
+        )
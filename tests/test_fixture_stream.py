@@ -0,0 +1,27 @@
+import io
+
+from reviews import fixture_stream
+from reviews.fixture_stream import read_objects
+
+
+class TestFixtureStream:
+
+    def test_json_array_is_read_in_blocks(self, monkeypatch):
+        monkeypatch.setattr(fixture_stream, 'READ_SIZE', 7)
+        stream = io.StringIO(
+            ' [{"model": "reviews.genre", "pk": 1, "fields": '
+            '{"name": "Рок, [и] {не только}"}},\n'
+            '{"model": "reviews.genre", "pk": 2, "fields": {}}]'
+        )
+        objects = list(read_objects(stream, 'json'))
+        assert [obj['pk'] for obj in objects] == [1, 2], (
+            'Проверьте потоковое чтение JSON-массива фикстуры'
+        )
+        assert objects[0]['fields']['name'] == 'Рок, [и] {не только}'
+
+    def test_empty_array(self):
+        assert list(read_objects(io.StringIO('[]'), 'json')) == []
+
+    def test_jsonl(self):
+        stream = io.StringIO('{"pk": 1}\n\n{"pk": 2}\n')
+        assert [obj['pk'] for obj in read_objects(stream, 'jsonl')] == [1, 2]
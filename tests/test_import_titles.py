@@ -0,0 +1,107 @@
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+from reviews.importers import (ImportResult, build_title, check_encoding,
+                               get_format, import_chunk, read_rows)
+from reviews.models import Category, Genre, Title
+from users.models import CustomUser as User
+
+
+class TestReadRows:
+
+    def test_csv_genres_are_split(self):
+        stream = io.StringIO(
+            'name,year,category,genre\nДюна,1965,books," sci-fi ,classic"\n')
+        rows = list(read_rows(stream, 'csv'))
+        assert rows == [(2, {
+            'name': 'Дюна', 'year': '1965', 'category': 'books',
+            'genre': ['sci-fi', 'classic'],
+        })], 'Проверьте разбор жанров из колонки genre'
+
+    def test_jsonl_bad_line_does_not_stop_reading(self):
+        stream = io.StringIO('{"name": "A"}\n{oops\n\n{"name": "B"}\n')
+        rows = list(read_rows(stream, 'jsonl'))
+        assert [line for line, _ in rows] == [1, 2, 4]
+        assert '_error' in rows[1][1], (
+            'Проверьте, что некорректная строка JSONL помечается ошибкой'
+        )
+
+    def test_jsonl_non_object_is_error_row(self):
+        stream = io.StringIO('5\n["a"]\nnull\n')
+        rows = list(read_rows(stream, 'jsonl'))
+        assert all('_error' in row for _, row in rows), (
+            'Проверьте, что строка JSONL не с объектом помечается ошибкой'
+        )
+
+    def test_check_encoding(self):
+        stream = io.BytesIO('Дюна'.encode())
+        check_encoding(stream, block_size=3)
+        assert stream.tell() == 0, (
+            'Проверьте, что после проверки поток возвращается в начало'
+        )
+        with pytest.raises(UnicodeDecodeError):
+            check_encoding(io.BytesIO('Дюна'.encode('cp1251')))
+
+    def test_format(self):
+        assert get_format('titles.CSV') == 'csv'
+        assert get_format('dump.txt', 'jsonl') == 'jsonl'
+        with pytest.raises(ValueError):
+            get_format('titles.xml')
+
+
+class TestBuildTitle:
+
+    @pytest.mark.parametrize('row, field', [
+        ({'_error': 'Некорректный JSON'}, 'non_field_errors'),
+        ({'year': 1965}, 'name'),
+        ({'name': 'Дюна', 'year': 'давно'}, 'year'),
+        ({'name': 'Дюна', 'year': 1965, 'description': 5}, 'description'),
+        ({'name': 'Дюна', 'year': 1965, 'category': ['books']}, 'category'),
+        ({'name': 'Дюна', 'year': 1965, 'category': 'films'}, 'category'),
+    ])
+    def test_errors(self, row, field):
+        errors = {}
+        assert build_title(row, {}, errors) is None
+        assert field in errors, (
+            f'Проверьте, что ошибка в поле {field} попадает в отчёт'
+        )
+
+
+@pytest.mark.django_db
+class TestImportChunk:
+
+    def test_error_rows_are_reported(self):
+        Category.objects.create(name='Книги', slug='books')
+        Genre.objects.create(name='Фантастика', slug='sci-fi')
+        result = ImportResult()
+        import_chunk([
+            (1, {'name': 'Дюна', 'year': 1965, 'category': 'books',
+                 'genre': ['sci-fi']}),
+            (2, {'name': 'Солярис', 'year': 1961, 'genre': [['sci-fi']]}),
+            (3, {'name': 'Пикник', 'year': 1972, 'genre': 'sci-fi'}),
+            (4, {'name': 'Улитка', 'year': 1966, 'genre': ['horror']}),
+            (5, {'_error': 'Ожидается объект JSON.'}),
+        ], result)
+        assert result.created == 1
+        assert [error['line'] for error in result.errors] == [2, 3, 4, 5], (
+            'Проверьте, что ошибочные строки попадают в отчёт, '
+            'а корректные сохраняются'
+        )
+        title = Title.objects.get()
+        assert list(title.genre.values_list('slug', flat=True)) == ['sci-fi']
+
+    def test_upload_not_utf8(self):
+        admin = User.objects.create(
+            username='admin', email='admin@yamdb.ru', role='admin')
+        client = APIClient()
+        client.force_authenticate(admin)
+        upload = SimpleUploadedFile(
+            'titles.jsonl',
+            '{"name": "Дюна", "year": 1965}\n'.encode('cp1251'))
+        response = client.post('/api/v1/titles/import/', {'file': upload})
+        assert response.status_code == 400, (
+            'Проверьте, что файл не в UTF-8 отклоняется с кодом 400'
+        )
+        assert not Title.objects.exists()
@@ -0,0 +1,40 @@
+from collections import defaultdict
+
+from reviews.leaderboards import bayesian_score, build_board
+from reviews.models import TitleRank
+
+
+class TestLeaderboards:
+
+    def test_few_reviews_pulled_to_mean(self):
+        single = bayesian_score(10, 1, mean=5, weight=10)
+        many = bayesian_score(90, 10, mean=5, weight=10)
+        assert single < many, (
+            'Проверьте, что одна высокая оценка не перевешивает '
+            'много хороших'
+        )
+
+    def test_positions_per_scope(self):
+        genres = defaultdict(list, {1: [7], 2: [7], 3: []})
+        stats = [
+            (1, 5, 40, 5),
+            (2, None, 90, 10),
+            (3, 5, 10, 10),
+        ]
+        ranks = list(build_board(TitleRank.TOP, stats, 5, genres))
+        board = [
+            (rank.category_id, rank.genre_id, rank.position, rank.title_id)
+            for rank in ranks
+        ]
+        assert board == [
+            (None, None, 1, 2),
+            (None, 7, 1, 2),
+            (None, None, 2, 1),
+            (5, None, 1, 1),
+            (None, 7, 2, 1),
+            (None, None, 3, 3),
+            (5, None, 2, 3),
+        ], (
+            'Проверьте, что позиции считаются отдельно для общего '
+            'рейтинга, категорий и жанров'
+        )
@@ -0,0 +1,28 @@
+from api import metrics
+from api.metrics import Histogram
+
+
+class TestMetrics:
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram((1, 5))
+        for value in (0, 1, 3, 7):
+            histogram.observe(value)
+        lines = histogram.render('m', 'route="r"')
+        assert lines == [
+            'm_bucket{route="r",le="1"} 2',
+            'm_bucket{route="r",le="5"} 3',
+            'm_bucket{route="r",le="+Inf"} 4',
+            'm_sum{route="r"} 11',
+            'm_count{route="r"} 4',
+        ], 'Проверьте формат гистограммы Prometheus'
+
+    def test_render_groups_by_route(self):
+        metrics.reset()
+        metrics.observe('titles-list', 0.02, 3, 0.001)
+        metrics.observe('titles-list', 0.03, 3, 0.001)
+        text = metrics.render()
+        assert '# TYPE yamdb_request_duration_seconds histogram' in text
+        assert 'yamdb_request_db_queries_count{route="titles-list"} 2' in text
+        assert 'yamdb_request_db_queries_sum{route="titles-list"} 6' in text
+        metrics.reset()
@@ -0,0 +1,51 @@
+import pytest
+from api.cache import invalidate_catalog
+from api.serializers import ModerationSerializer
+from reviews import signals
+from reviews.models import Review, Title
+from reviews.moderation import delete_in_chunks
+from users.models import CustomUser as User
+
+
+class TestModeration:
+
+    def test_requires_some_condition(self):
+        assert not ModerationSerializer(data={}).is_valid(), (
+            'Проверьте, что без условий удалить все отзывы нельзя'
+        )
+        serializer = ModerationSerializer(data={
+            'since': '2022-02-01T00:00:00Z', 'until': '2022-01-01T00:00:00Z'})
+        assert not serializer.is_valid()
+        assert ModerationSerializer(data={'ids': [1, 2]}).is_valid()
+
+    def test_rating_changes_applied_once_per_title(self, monkeypatch):
+        applied = []
+        monkeypatch.setattr(
+            signals, 'apply_rating_deltas',
+            lambda title_id, deltas: applied.append((title_id, deltas)))
+        with signals.batched_updates():
+            signals.change_rating(1, removed=5)
+            signals.change_rating(1, removed=7)
+            signals.change_rating(2, removed=5)
+            assert not applied
+        assert applied == [(1, {5: -1, 7: -1}), (2, {5: -1})], (
+            'Проверьте, что при массовом удалении рейтинг произведения '
+            'обновляется один раз'
+        )
+
+    @pytest.mark.django_db
+    def test_catalog_invalidated_once_per_chunk(self, monkeypatch):
+        title = Title.objects.create(name='Дюна', year=1965)
+        for number in range(3):
+            author = User.objects.create(
+                username=f'author{number}', email=f'author{number}@yamdb.ru')
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=5)
+        queued = []
+        monkeypatch.setattr(signals.transaction, 'on_commit', queued.append)
+        delete_in_chunks(Review.objects.all(), chunk_size=10)
+        assert not Review.objects.exists()
+        assert queued.count(invalidate_catalog) == 1, (
+            'Проверьте, что кэш каталога сбрасывается один раз на пачку, '
+            'а не на каждый удалённый отзыв'
+        )
@@ -0,0 +1,26 @@
+from api.views import CommentViewSet, ReviewViewSet
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+class TestReviewsPagination:
+
+    def get_paginator(self, viewset, url):
+        view = viewset(request=Request(APIRequestFactory().get(url)))
+        return view.paginator
+
+    def test_page_number_is_default(self):
+        for viewset in (ReviewViewSet, CommentViewSet):
+            paginator = self.get_paginator(viewset, '/?page=2')
+            assert isinstance(paginator, PageNumberPagination), (
+                'Проверьте, что по умолчанию используется PageNumberPagination'
+            )
+
+    def test_cursor_mode_is_opt_in(self):
+        for url in ('/?pagination=cursor', '/?cursor=cD0x'):
+            paginator = self.get_paginator(ReviewViewSet, url)
+            assert isinstance(paginator, CursorPagination), (
+                'Проверьте, что курсорная пагинация включается параметром'
+            )
+            assert paginator.ordering == ('-pub_date', '-id')
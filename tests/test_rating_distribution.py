@@ -0,0 +1,41 @@
+from api.serializers import RatingDistributionSerializer
+from reviews.models import SCORES, Title, score_field
+
+
+def make_title(*scores):
+    title = Title(name='Произведение', year=2000)
+    for score in scores:
+        field = score_field(score)
+        setattr(title, field, getattr(title, field) + 1)
+    title.rating_sum = sum(scores)
+    title.rating_count = len(scores)
+    return title
+
+
+class TestRatingDistribution:
+
+    def test_counter_per_score(self):
+        fields = {field.name for field in Title._meta.get_fields()
+                  if field.name.startswith('score_')}
+        assert fields == {score_field(score) for score in SCORES}, (
+            'Проверьте, что у Title есть счётчик на каждую оценку '
+            'от MIN_SCORE до MAX_SCORE'
+        )
+
+    def test_median_from_histogram(self):
+        assert make_title(3, 7, 7).rating_median == 7
+        assert make_title(3, 7, 8, 10).rating_median == 7.5, (
+            'Проверьте, что при чётном числе оценок медиана '
+            'равна среднему двух центральных оценок'
+        )
+        assert make_title().rating_median is None
+
+    def test_serializer_uses_stored_counters(self):
+        data = RatingDistributionSerializer(make_title(1, 2, 2)).data
+        assert data['count'] == 3
+        assert data['mean'] == 1.67
+        assert data['median'] == 2
+        assert data['histogram']['2'] == 2
+        assert len(data['histogram']) == 10, (
+            'Проверьте, что гистограмма содержит все допустимые оценки'
+        )
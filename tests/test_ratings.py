@@ -0,0 +1,77 @@
+import io
+
+import pytest
+from django.core.management import CommandError, call_command
+from reviews.models import SCORES, Review, Title, score_field
+from users.models import CustomUser as User
+
+
+def make_reviews(title, *scores):
+    reviews = []
+    for score in scores:
+        number = User.objects.count()
+        author = User.objects.create(
+            username=f'author{number}', email=f'author{number}@yamdb.ru')
+        reviews.append(Review.objects.create(
+            title=title, author=author, text='Отзыв', score=score))
+    return reviews
+
+
+def assert_rating(title, *scores):
+    title.refresh_from_db()
+    assert (title.rating_sum, title.rating_count) == (
+        sum(scores), len(scores)), (
+        'Проверьте, что сумма и количество оценок совпадают с отзывами'
+    )
+    assert title.score_histogram == {
+        score: scores.count(score) for score in SCORES}
+
+
+def rebuild_ratings(*args):
+    call_command('rebuild_ratings', *args, stdout=io.StringIO())
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Дюна', year=1965)
+
+
+@pytest.mark.django_db
+class TestRatings:
+
+    def test_create_change_delete(self, title):
+        first, second = make_reviews(title, 8, 4)
+        assert_rating(title, 8, 4)
+        first.score = 2
+        first.save()
+        assert_rating(title, 2, 4)
+        second.delete()
+        assert_rating(title, 2)
+        assert title.rating == 2
+
+    def test_stale_title_save_keeps_rating(self, title):
+        stale = Title.objects.get(pk=title.pk)
+        review, = make_reviews(title, 8)
+        review.score = 4
+        review.save()
+        stale.description = 'Описание'
+        stale.save()
+        assert_rating(title, 4)
+        assert title.description == 'Описание', (
+            'Проверьте, что остальные поля произведения сохраняются'
+        )
+        rebuild_ratings('--check')
+
+    def test_rebuild_ratings_check_and_repair(self, title):
+        make_reviews(title, 8, 4)
+        rebuild_ratings('--check')
+        Title.objects.filter(pk=title.pk).update(
+            rating_sum=1, **{score_field(8): 0})
+        with pytest.raises(CommandError):
+            rebuild_ratings('--check')
+        assert Title.objects.get(pk=title.pk).rating_sum == 1, (
+            'Проверьте, что --check ничего не исправляет'
+        )
+        rebuild_ratings()
+        assert_rating(title, 8, 4)
+        rebuild_ratings('--check')
@@ -0,0 +1,176 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from api.db import ReplicaRouter, current_replica, read_from
+from api.middleware import ReplicaMiddleware
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+from reviews.models import Review
+
+from .conftest import root_dir
+
+# Отдельный процесс: основная база и реплика — два файла SQLite,
+# реплика — копия основной до записи, то есть отстающая.
+REPLICA_SCRIPT = '''
+import json
+import os
+import shutil
+import sys
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'api_yamdb.settings_test'
+from api_yamdb import settings_test
+
+primary, replica = (os.path.join(sys.argv[1], name)
+                    for name in ('primary.sqlite3', 'replica.sqlite3'))
+settings_test.DATABASES = {
+    'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': primary},
+    'replica1': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': replica},
+}
+settings_test.DATABASE_REPLICAS = ['replica1']
+
+import django
+django.setup()
+from api.authentication import get_access_token
+from django.core.management import call_command
+from django.db import connections
+from rest_framework.test import APIClient
+from reviews.models import Title
+from users.models import CustomUser as User
+
+call_command('migrate', run_syncdb=True, verbosity=0)
+title = Title.objects.create(name='Дюна', year=1965)
+writer, other = (User.objects.create(username=name, email=f'{name}@yamdb.ru')
+                 for name in ('writer', 'other'))
+connections.close_all()
+shutil.copy(primary, replica)
+
+replica_queries = []
+
+
+def record(execute, sql, *args):
+    replica_queries.append(sql)
+    return execute(sql, *args)
+
+
+def client(user=None):
+    api_client = APIClient()
+    if user is not None:
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {get_access_token(user)}')
+    return api_client
+
+
+def count_reviews(api_client):
+    response = api_client.get(f'/api/v1/titles/{title.id}/reviews/')
+    return response.data['count']
+
+
+with connections['replica1'].execute_wrapper(record):
+    result = {'anonymous': count_reviews(client())}
+    result['reads_replica'] = bool(replica_queries)
+    result['created'] = client(writer).post(
+        f'/api/v1/titles/{title.id}/reviews/',
+        {'text': 'Отзыв', 'score': 8}).status_code
+    replica_queries.clear()
+    result['writer'] = count_reviews(client(writer))
+    result['writer_reads_replica'] = bool(replica_queries)
+    result['other'] = count_reviews(client(other))
+print(json.dumps(result))
+'''
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica1']
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def serve(method, status=200, ip='10.0.0.1'):
+    """Прогоняет запрос через middleware; возвращает базу для чтения."""
+    seen = []
+
+    def get_response(request):
+        seen.append(ReplicaRouter().db_for_read(Review))
+        return HttpResponse(status=status)
+
+    request = getattr(RequestFactory(), method)('/', REMOTE_ADDR=ip)
+    ReplicaMiddleware(get_response)(request)
+    return seen[0]
+
+
+class TestReplicas:
+
+    def test_safe_request_reads_replica(self, replicas):
+        assert serve('get') == 'replica1', (
+            'Проверьте, что GET-запрос читает с реплики'
+        )
+        assert current_replica() is None, (
+            'Проверьте, что после запроса поток снова читает из default'
+        )
+
+    def test_write_pins_client_to_primary(self, replicas):
+        assert serve('post') is None, (
+            'Проверьте, что изменяющий запрос читает из default'
+        )
+        assert serve('get') is None, (
+            'Проверьте, что после записи клиент читает из default'
+        )
+        assert serve('get', ip='10.0.0.2') == 'replica1', (
+            'Проверьте, что запись не влияет на других клиентов'
+        )
+
+    def test_failed_write_does_not_pin(self, replicas):
+        serve('post', status=400)
+        assert serve('get') == 'replica1', (
+            'Проверьте, что отклонённый запрос не закрепляет клиента '
+            'за основной базой'
+        )
+
+    def test_write_switches_request_to_primary(self, replicas):
+        router = ReplicaRouter()
+        with read_from('replica1'):
+            router.db_for_write(Review)
+            assert router.db_for_read(Review) is None, (
+                'Проверьте, что после записи запрос читает свои изменения '
+                'из default'
+            )
+
+    def test_replicas_are_not_migrated(self, replicas):
+        router = ReplicaRouter()
+        assert router.allow_migrate('replica1', 'reviews') is False, (
+            'Проверьте, что миграции не применяются к репликам'
+        )
+        assert router.allow_migrate('default', 'reviews') is None, (
+            'Проверьте, что роутер не мешает миграциям default'
+        )
+
+
+class TestSqliteReplica:
+
+    def test_reads_go_to_replica_and_writer_is_pinned(self, tmp_path):
+        env = {**os.environ,
+               'PYTHONPATH': os.path.join(root_dir, 'api_yamdb')}
+        process = subprocess.run(
+            [sys.executable, '-c', REPLICA_SCRIPT, str(tmp_path)],
+            cwd=root_dir, env=env, capture_output=True, text=True,
+            timeout=120)
+        assert process.returncode == 0, process.stderr
+        result = json.loads(process.stdout.splitlines()[-1])
+        assert result['reads_replica'], (
+            'Проверьте, что GET-запросы читают из реплики'
+        )
+        assert result['created'] == 201
+        assert result['writer'] == 1 and not result['writer_reads_replica'], (
+            'Проверьте, что после записи автор читает из основной базы '
+            'и видит свой отзыв'
+        )
+        assert result['other'] == 0, (
+            'Проверьте, что остальные клиенты по-прежнему читают '
+            'из отстающей реплики'
+        )
@@ -0,0 +1,85 @@
+import pytest
+from rest_framework.test import APIClient
+from reviews.models import Comment, Review, Title
+from users.models import CustomUser as User
+
+
+@pytest.fixture
+def title():
+    title = Title.objects.create(name='Произведение', year=2000)
+    for number in range(8):
+        author = User.objects.create(
+            username=f'author{number}', email=f'author{number}@yamdb.ru')
+        Review.objects.create(title=title, author=author, text='Отзыв')
+    # Равные значения: порядок внутри них задаёт id.
+    Review.objects.filter(author__username__in=('author1', 'author2')).update(
+        comments_count=3)
+    return title
+
+
+def walk(url):
+    """id отзывов со всех страниц по ссылкам next."""
+    client, ids = APIClient(), []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, response.data
+        ids += [review['id'] for review in response.data['results']]
+        url = response.data['next']
+    return ids
+
+
+@pytest.mark.django_db
+class TestReviewOrdering:
+
+    def test_ordering_has_id_tiebreaker(self, title):
+        ids = walk(
+            f'/api/v1/titles/{title.id}/reviews/?ordering=-comments_count')
+        expected = list(Review.objects.order_by(
+            '-comments_count', '-id').values_list('id', flat=True))
+        assert ids == expected, (
+            'Проверьте, что при равных значениях отзывы упорядочены по id '
+            'и страницы не повторяют и не теряют их'
+        )
+
+    def test_cursor_walks_all_reviews(self, title):
+        ids = walk(f'/api/v1/titles/{title.id}/reviews/?pagination=cursor')
+        expected = list(Review.objects.order_by(
+            '-pub_date', '-id').values_list('id', flat=True))
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация проходит все отзывы'
+        )
+
+    @pytest.mark.parametrize('ordering', [
+        'last_comment_at', '-last_comment_at', '-comments_count'])
+    def test_cursor_rejects_ordering(self, title, ordering):
+        response = APIClient().get(
+            f'/api/v1/titles/{title.id}/reviews/',
+            {'ordering': ordering, 'pagination': 'cursor'})
+        assert response.status_code == 400, (
+            'Проверьте, что курсорная пагинация не сочетается с ?ordering'
+        )
+
+    @pytest.mark.parametrize('ordering', [
+        'score', 'comments_count', '-last_comment_at'])
+    def test_comments_ignore_review_fields(self, title, ordering):
+        review = Review.objects.first()
+        for number in range(3):
+            Comment.objects.create(
+                review=review, author=review.author, text=f'{number}')
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        response = APIClient().get(url, {'ordering': ordering})
+        assert response.status_code == 200, (
+            'Проверьте, что комментарии не сортируются по полям отзыва'
+        )
+        assert len(response.data['results']) == 3
+
+    def test_comments_ordering_by_pub_date(self, title):
+        review = Review.objects.first()
+        comments = [
+            Comment.objects.create(
+                review=review, author=review.author, text=f'{number}')
+            for number in range(3)
+        ]
+        ids = walk(f'/api/v1/titles/{title.id}/reviews/{review.id}'
+                   '/comments/?ordering=pub_date')
+        assert ids == [comment.id for comment in comments]
@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from reviews import search
+from reviews.importers import ImportResult, import_chunk
+from reviews.models import Title
+from reviews.search import (FTS_TABLE, create_search_index,
+                            rebuild_search_index, search_titles)
+
+
+def found(query):
+    return list(search_titles(Title.objects.all(), query).values_list(
+        'name', flat=True))
+
+
+def indexed():
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT rowid, name FROM {FTS_TABLE} ORDER BY rowid')
+        return cursor.fetchall()
+
+
+@pytest.mark.django_db
+class TestSqliteSearch:
+
+    def test_index_search_and_delete(self):
+        create_search_index()
+        title = Title.objects.create(name='Дюна', year=1965)
+        Title.objects.create(name='Солярис', year=1961)
+        assert found('дюн') == ['Дюна'], (
+            'Проверьте, что новое произведение находится по началу слова'
+        )
+        title.name = 'Дети Дюны'
+        title.save()
+        assert found('дети') == ['Дети Дюны'], (
+            'Проверьте, что переименование обновляет индекс'
+        )
+        title.delete()
+        assert found('дюн') == []
+        assert [name for _, name in indexed()] == ['Солярис'], (
+            'Проверьте, что удалённое произведение удаляется из индекса'
+        )
+
+    def test_bulk_create_and_rebuild(self):
+        import_chunk([
+            (1, {'name': 'Пикник на обочине', 'year': 1972}),
+            (2, {'name': 'Улитка на склоне', 'year': 1966}),
+        ], ImportResult())
+        assert sorted(found('на')) == ['Пикник на обочине', 'Улитка на склоне']
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        assert found('пикник') == []
+        rebuild_search_index()
+        assert found('пикник') == ['Пикник на обочине'], (
+            'Проверьте, что rebuild_search_index заполняет индекс заново'
+        )
+        assert sorted(indexed()) == sorted(
+            Title.objects.values_list('id', 'name'))
+
+    def test_ranking(self):
+        Title.objects.create(name='Мастер', year=1967)
+        Title.objects.create(name='Мастер и Маргарита', year=1967)
+        results = search_titles(Title.objects.all(), 'мастер маргарита')
+        assert [title.name for title in results] == ['Мастер и Маргарита']
+        assert results[0].search_rank > 0
+
+    def test_fallback_without_fts(self, monkeypatch):
+        monkeypatch.setitem(search._fts_tables, connection.alias, False)
+        Title.objects.create(name='Дюна', year=1965)
+        assert found('Дюн') == ['Дюна'], (
+            'Проверьте, что без FTS5 поиск идёт по подстроке названия'
+        )
+        assert FTS_TABLE not in str(
+            search_titles(Title.objects.all(), 'Дюн').query)
+        assert indexed() == [], (
+            'Проверьте, что без FTS5 индекс не обновляется'
+        )
+
+    def test_empty_query(self):
+        Title.objects.create(name='Дюна', year=1965)
+        assert found('!!!') == []
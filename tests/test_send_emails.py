@@ -0,0 +1,145 @@
+import io
+from datetime import timedelta
+from smtplib import SMTPException
+
+import pytest
+from api.utils import send_confirmation_code
+from django.conf import settings
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from users.management.commands import send_emails as command
+from users.models import OutboxEmail
+
+BAD_RECIPIENT = 'bad@yamdb.ru'
+
+
+@pytest.fixture
+def failing_backend(monkeypatch):
+    send_messages = EmailBackend.send_messages
+
+    def send_or_fail(backend, messages):
+        if any(BAD_RECIPIENT in message.to for message in messages):
+            raise SMTPException('Сервер недоступен')
+        return send_messages(backend, messages)
+
+    monkeypatch.setattr(EmailBackend, 'send_messages', send_or_fail)
+
+
+def send_emails():
+    call_command('send_emails', '--once', stderr=io.StringIO())
+
+
+@pytest.mark.django_db
+class TestSendEmails:
+
+    def test_signup_enqueues_email(self):
+        response = APIClient().post(
+            '/api/v1/auth/signup/',
+            {'username': 'reader', 'email': 'reader@yamdb.ru'})
+        assert response.status_code == 200
+        assert mail.outbox == [], (
+            'Проверьте, что регистрация не отправляет письмо сама'
+        )
+        assert OutboxEmail.objects.filter(
+            recipient='reader@yamdb.ru', sent_at__isnull=True).exists()
+
+    def test_send(self):
+        send_confirmation_code('reader@yamdb.ru', '123456')
+        send_emails()
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['reader@yamdb.ru']
+        assert '123456' in mail.outbox[0].body
+        email = OutboxEmail.objects.get()
+        assert email.sent_at is not None and email.attempts == 1, (
+            'Проверьте, что отправленное письмо отмечается sent_at'
+        )
+        send_emails()
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленное письмо не отправляется повторно'
+        )
+
+    def test_retry_with_backoff(self, failing_backend):
+        send_confirmation_code(BAD_RECIPIENT, '111111')
+        send_confirmation_code('reader@yamdb.ru', '222222')
+        before = timezone.now()
+        send_emails()
+        assert [message.to for message in mail.outbox] == [
+            ['reader@yamdb.ru']], (
+            'Проверьте, что ошибка одного письма не мешает остальным'
+        )
+        email = OutboxEmail.objects.get(recipient=BAD_RECIPIENT)
+        assert email.sent_at is None and email.attempts == 1
+        assert 'Сервер недоступен' in email.last_error
+        delay = timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_DELAY)
+        assert before + delay <= email.next_attempt_at <= (
+            timezone.now() + delay)
+
+        send_emails()
+        email.refresh_from_db()
+        assert email.attempts == 1, (
+            'Проверьте, что письмо не отправляется до next_attempt_at'
+        )
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        before = timezone.now()
+        send_emails()
+        email.refresh_from_db()
+        assert email.attempts == 2
+        assert email.next_attempt_at >= before + 2 * delay, (
+            'Проверьте, что пауза между попытками растёт вдвое'
+        )
+
+    def test_max_attempts(self, failing_backend):
+        send_confirmation_code(BAD_RECIPIENT, '111111')
+        OutboxEmail.objects.update(
+            attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS)
+        send_emails()
+        assert OutboxEmail.objects.get().attempts == (
+            settings.EMAIL_OUTBOX_MAX_ATTEMPTS), (
+            'Проверьте, что после EMAIL_OUTBOX_MAX_ATTEMPTS попыток '
+            'письмо больше не отправляется'
+        )
+
+    def test_batch_size(self):
+        for number in range(3):
+            send_confirmation_code(f'reader{number}@yamdb.ru', '123456')
+        call_command('send_emails', '--batch-size', '2', '--once')
+        assert len(mail.outbox) == 3, (
+            'Проверьте, что --once разбирает очередь до конца пачками'
+        )
+        assert not OutboxEmail.objects.filter(sent_at__isnull=True).exists()
+
+    def test_server_down(self, monkeypatch):
+        def refuse(backend):
+            raise ConnectionRefusedError('Соединение отклонено')
+
+        monkeypatch.setattr(EmailBackend, 'open', refuse, raising=False)
+        for number in range(3):
+            send_confirmation_code(f'reader{number}@yamdb.ru', '123456')
+        sleeps = []
+
+        def stop(seconds):
+            sleeps.append(seconds)
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(command.time, 'sleep', stop)
+        before = timezone.now()
+        with pytest.raises(KeyboardInterrupt):
+            call_command('send_emails', '--interval', '7',
+                         stderr=io.StringIO())
+        assert sleeps == [7], (
+            'Проверьте, что при недоступном сервере обработчик ждёт '
+            'интервал опроса, а не падает'
+        )
+        delay = timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_DELAY)
+        for email in OutboxEmail.objects.all():
+            assert email.sent_at is None and email.attempts == 1, (
+                'Проверьте, что неудачная попытка соединения учитывается '
+                'для каждого письма пачки'
+            )
+            assert 'Соединение отклонено' in email.last_error
+            assert email.next_attempt_at >= before + delay
+        assert mail.outbox == []
@@ -0,0 +1,45 @@
+import pytest
+from api.cache import catalog_cache_enabled, check_shared_cache
+from django.core.exceptions import ImproperlyConfigured
+
+LOCMEM = {'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+DUMMY = {'default': {
+    'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class TestSharedCache:
+
+    def test_locmem_with_workers_disables_catalog_cache(self, settings,
+                                                         caplog):
+        settings.CACHES = LOCMEM
+        settings.WEB_WORKERS = 3
+        settings.CATALOG_CACHE = True
+        settings.DATABASE_REPLICAS = []
+        check_shared_cache()
+        assert not catalog_cache_enabled(), (
+            'Проверьте, что без общего кэша кэш каталога отключается, '
+            'а приложение запускается'
+        )
+        assert 'CACHE_BACKEND' in caplog.text
+
+    def test_replica_pins_need_shared_cache(self, settings):
+        settings.CACHES = LOCMEM
+        settings.WEB_WORKERS = 3
+        settings.CATALOG_CACHE = False
+        settings.DATABASE_REPLICAS = ['replica1']
+        with pytest.raises(ImproperlyConfigured):
+            check_shared_cache()
+
+    @pytest.mark.parametrize('caches, workers, enabled, active', [
+        (LOCMEM, 1, True, True),
+        (LOCMEM, 3, False, False),
+        (DUMMY, 3, True, True),
+    ])
+    def test_allowed(self, settings, caches, workers, enabled, active):
+        settings.CACHES = caches
+        settings.WEB_WORKERS = workers
+        settings.CATALOG_CACHE = enabled
+        settings.DATABASE_REPLICAS = []
+        check_shared_cache()
+        assert catalog_cache_enabled() == active
@@ -0,0 +1,53 @@
+from api import throttling
+from api.throttling import LocalCounterStore, SignUpRateThrottle
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+class Throttle(SignUpRateThrottle):
+    now = 0
+
+    def get_rate(self):
+        return '10/min'
+
+    def timer(self):
+        return self.now
+
+
+class TestThrottling:
+
+    def check(self, now, address='10.0.0.1'):
+        request = Request(APIRequestFactory().post('/', REMOTE_ADDR=address))
+        throttle = Throttle()
+        throttle.now = now
+        return throttle.allow_request(request, None), throttle
+
+    def test_local_store_rolls_windows(self):
+        store = LocalCounterStore(max_keys=10)
+        assert store.hit('a', 1, 60) == (0, 1)
+        assert store.hit('a', 1, 60) == (0, 2)
+        assert store.hit('a', 2, 60) == (2, 1)
+        assert store.hit('a', 4, 60) == (0, 1), (
+            'Проверьте, что запросы давно прошедшего окна не учитываются'
+        )
+
+    def test_local_store_is_bounded(self):
+        store = LocalCounterStore(max_keys=3)
+        for key in 'abcde':
+            store.hit(key, 1, 60)
+        assert len(store.counters) < 3 + 1
+        assert 'e' in store.counters
+
+    def test_previous_window_weight_decays(self, monkeypatch):
+        monkeypatch.setattr(
+            throttling, 'store', LocalCounterStore(max_keys=10))
+        assert all(self.check(59)[0] for _ in range(10))
+        allowed, throttle = self.check(60)
+        assert not allowed, (
+            'Проверьте, что на стыке окон учитываются запросы прошлого окна'
+        )
+        assert throttle.wait() > 0
+        assert self.check(60, address='10.0.0.2')[0]
+        assert self.check(115)[0], (
+            'Проверьте, что к концу окна вклад прошлого окна спадает'
+        )
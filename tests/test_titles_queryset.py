@@ -0,0 +1,74 @@
+import pytest
+from django.conf import settings as django_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Title
+from users.models import CustomUser as User
+
+URL = '/api/v1/titles/'
+
+
+def make_titles(count, genres=2):
+    prefix = Category.objects.count()
+    category = Category.objects.create(name='Книги', slug=f'books{prefix}')
+    genre = [Genre.objects.create(name=f'Жанр {number}',
+                                  slug=f'genre{prefix}-{number}')
+             for number in range(genres)]
+    titles = []
+    for number in range(count):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category)
+        title.genre.set(genre)
+        titles.append(title)
+    return titles
+
+
+def count_queries(method, url, client=None, **data):
+    client = client or APIClient()
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data)
+    assert response.status_code == 200, response.content
+    return len(context)
+
+
+@pytest.fixture(autouse=True)
+def no_catalog_cache(settings):
+    settings.CATALOG_CACHE = False
+
+
+@pytest.fixture
+def admin_client():
+    admin = User.objects.create(
+        username='admin', email='admin@yamdb.ru',
+        role=django_settings.ADMIN)
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+@pytest.mark.django_db
+class TestTitlesQueries:
+
+    @pytest.mark.parametrize('params', ['', '?expand=1'])
+    def test_list_queries_do_not_grow(self, params):
+        make_titles(1)
+        single = count_queries('get', URL + params)
+        make_titles(5)
+        many = count_queries('get', URL + params)
+        assert single == many, (
+            'Проверьте, что число запросов списка произведений не зависит '
+            f'от их количества: {single} для одного, {many} для шести'
+        )
+
+    def test_write_representation_queries_do_not_grow(self, admin_client):
+        few, = make_titles(1, genres=1)
+        many, = make_titles(1, genres=5)
+        single = count_queries(
+            'patch', f'{URL}{few.pk}/', admin_client, name='Новое')
+        several = count_queries(
+            'patch', f'{URL}{many.pk}/', admin_client, name='Новое')
+        assert single == several, (
+            'Проверьте, что ответ после записи загружает жанры одним '
+            'запросом, а не по одному на жанр'
+        )
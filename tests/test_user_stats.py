@@ -0,0 +1,69 @@
+import io
+
+import pytest
+from django.core.management import CommandError, call_command
+from rest_framework.test import APIClient
+from reviews.models import Review, Title
+from users.models import CustomUser as User
+
+
+def assert_counters(user, reviews, score_sum):
+    user.refresh_from_db()
+    assert (user.review_count, user.score_sum) == (reviews, score_sum), (
+        'Проверьте, что сохранение профиля не затирает счётчики '
+        'пользователя'
+    )
+
+
+@pytest.fixture
+def user():
+    return User.objects.create(
+        username='reader', email='reader@yamdb.ru', confirmation_code='code')
+
+
+@pytest.fixture
+def review(user):
+    title = Title.objects.create(name='Дюна', year=1965)
+    return Review.objects.create(
+        title=title, author=user, text='Отзыв', score=8)
+
+
+@pytest.mark.django_db
+class TestUserCounters:
+
+    def test_stale_user_save_keeps_counters(self, user):
+        stale = User.objects.get(pk=user.pk)
+        title = Title.objects.create(name='Дюна', year=1965)
+        Review.objects.create(title=title, author=user, text='Отзыв', score=8)
+        stale.bio = 'Читатель'
+        stale.save()
+        assert_counters(user, 1, 8)
+        assert user.bio == 'Читатель'
+
+    def test_token_keeps_counters(self, user, review):
+        response = APIClient().post('/api/v1/auth/token/', {
+            'username': user.username, 'confirmation_code': 'code'})
+        assert response.status_code == 200
+        assert_counters(user, 1, 8)
+
+    def test_profile_update_keeps_counters(self, user, review):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.patch('/api/v1/users/me/', {'bio': 'Читатель'})
+        assert response.status_code == 200
+        assert_counters(user, 1, 8)
+
+    def test_rebuild_check_and_repair(self, user, review):
+        User.objects.filter(pk=user.pk).update(
+            review_count=5, comment_count=2, score_sum=0)
+        with pytest.raises(CommandError):
+            call_command('rebuild_user_stats', '--check',
+                         stdout=io.StringIO())
+        call_command('rebuild_user_stats', stdout=io.StringIO())
+        user.refresh_from_db()
+        assert (user.review_count, user.comment_count, user.score_sum) == (
+            1, 0, 8), (
+            'Проверьте, что rebuild_user_stats восстанавливает счётчики '
+            'по отзывам и комментариям'
+        )
+        call_command('rebuild_user_stats', '--check', stdout=io.StringIO())